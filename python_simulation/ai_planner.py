@@ -0,0 +1,164 @@
+import itertools
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+POSTURES = ("Attack", "Defend", "Reinforce")
+ATTACK, DEFEND, REINFORCE = range(3)
+
+# How each posture scales a side's firepower (offense) and the losses it takes (exposure)
+OFFENSE = np.array([1.5, 0.7, 1.0])
+EXPOSURE = np.array([1.2, 0.6, 1.0])
+TRANSFER = 0.2  # Share of each defending front's troops moved to the reinforcing fronts
+
+
+# ------------------ Rollout Planner ------------------
+class RolloutPlanner:
+    """
+    Search-based opponent: scores every joint posture (Attack / Defend / Reinforce
+    on each front) by simulating `horizon` days ahead with a noisy Lanchester
+    square-law attrition model, many rollouts at once, against a player whose
+    daily postures are random. Rollouts are added in batches until `time_budget`
+    seconds per call are spent (or `max_rollouts` are done), every joint posture
+    sees the same random draws, and finished decisions are kept in a
+    transposition cache keyed by the troop counts rounded to `quantum`.
+    """
+
+    def __init__(self, horizon=5, alpha=0.05, beta=0.05, noise=0.3, rollouts_per_batch=64, max_rollouts=2048,
+                 time_budget=0.05, cache_size=10000, quantum=1, seed=None):
+        self.horizon = horizon
+        self.alpha = alpha  # AI troop effectiveness per day
+        self.beta = beta    # Player troop effectiveness per day
+        self.noise = noise
+        self.rollouts_per_batch = rollouts_per_batch
+        self.max_rollouts = max_rollouts
+        self.time_budget = time_budget
+        self.cache_size = cache_size
+        self.quantum = quantum
+        self.rng = np.random.default_rng(seed)
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._actions = {}
+
+    def joint_actions(self, n_fronts):
+        """
+        All 3**n_fronts joint postures as an (A, n_fronts) array of posture codes.
+        """
+        if n_fronts not in self._actions:
+            self._actions[n_fronts] = np.array(list(itertools.product(range(len(POSTURES)), repeat=n_fronts)),
+                                               dtype=np.int8).reshape(-1, n_fronts)
+        return self._actions[n_fronts]
+
+    def _key(self, fronts, ai, player):
+        q = self.quantum
+        return fronts, tuple(int(round(x / q)) for x in ai), tuple(int(round(x / q)) for x in player)
+
+    # ------------------ Public Interface ------------------
+    def decide(self, ai_troops, player_troops):
+        """
+        Drop-in for the old ai_decision: {front: "Attack" | "Defend" | "Reinforce"}.
+        """
+        return self.decide_batch([(ai_troops, player_troops)])[0]
+
+    def decide_batch(self, states):
+        """
+        Plans many AI turns at once. `states` is a list of (ai_troops, player_troops)
+        dicts; states with the same fronts are evaluated together in one array pass.
+        """
+        decisions = [None] * len(states)
+        pending = {}
+        for i, (ai_troops, player_troops) in enumerate(states):
+            fronts = tuple(ai_troops)
+            if not fronts:
+                decisions[i] = {}
+                continue
+            ai = [float(ai_troops[front]) for front in fronts]
+            player = [float(player_troops[front]) for front in fronts]
+            key = self._key(fronts, ai, player)
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                decisions[i] = dict(zip(fronts, self.cache[key]))
+            else:
+                self.misses += 1
+                group = pending.setdefault(fronts, {})
+                group.setdefault(key, (ai, player, []))[2].append(i)
+
+        if pending:
+            deadline = time.perf_counter() + self.time_budget
+            for fronts, group in pending.items():
+                keys = list(group)
+                ai = np.array([group[key][0] for key in keys])
+                player = np.array([group[key][1] for key in keys])
+                best = self.joint_actions(len(fronts))[self.evaluate(ai, player, deadline).argmax(axis=1)]
+                for key, choice in zip(keys, best):
+                    postures = tuple(POSTURES[code] for code in choice)
+                    self._remember(key, postures)
+                    for i in group[key][2]:
+                        decisions[i] = dict(zip(fronts, postures))
+        return decisions
+
+    def _remember(self, key, postures):
+        self.cache[key] = postures
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    # ------------------ Batched Rollouts ------------------
+    def evaluate(self, ai, player, deadline=None):
+        """
+        Mean rollout score of every joint posture for a batch of states.
+        ai and player are (B, F) troop arrays; returns a (B, A) array where the
+        score is the AI's final troop margin over the player, as a share of all
+        troops on the map at the start.
+        """
+        ai = np.asarray(ai, dtype=np.float64)
+        player = np.asarray(player, dtype=np.float64)
+        if deadline is None:
+            deadline = time.perf_counter() + self.time_budget
+        actions = self.joint_actions(ai.shape[1])
+        total = np.maximum(ai.sum(axis=1) + player.sum(axis=1), 1.0)[:, None]
+
+        start_ai = self._deploy(ai, actions)
+        offense = OFFENSE[actions][None, :, None, :]
+        exposure = EXPOSURE[actions][None, :, None, :]
+
+        score = np.zeros((len(ai), len(actions)))
+        done = 0
+        while done == 0 or (done < self.max_rollouts and time.perf_counter() < deadline):
+            score += self._rollouts(start_ai, player, offense, exposure).sum(axis=2)
+            done += self.rollouts_per_batch
+        return score / done / total
+
+    def _deploy(self, ai, actions):
+        """
+        AI troops per (state, joint posture, front) after the Reinforce fronts have
+        drawn TRANSFER of every Defend front's troops, split evenly between them.
+        """
+        defend = actions == DEFEND
+        reinforce = actions == REINFORCE
+        pool = TRANSFER * (ai[:, None, :] * defend[None]).sum(axis=2, keepdims=True)
+        receivers = reinforce.sum(axis=1)[None, :, None]
+        share = np.divide(pool, receivers, out=np.zeros_like(pool), where=receivers > 0)
+        moved = np.where(receivers > 0, TRANSFER, 0.0) * defend[None]
+        deployed = ai[:, None, :] * (1.0 - moved) + share * reinforce[None]
+        return deployed[:, :, None, :]
+
+    def _rollouts(self, ai, player, offense, exposure):
+        """
+        One batch of rollouts: (B, A, R) final AI margins. The noise and the player's
+        postures are drawn once per (state, rollout) and shared by every joint posture.
+        """
+        shape = (ai.shape[0], 1, self.rollouts_per_batch, ai.shape[3])
+        rng = self.rng
+        ai = np.broadcast_to(ai, (ai.shape[0], ai.shape[1], self.rollouts_per_batch, ai.shape[3])).copy()
+        player = np.broadcast_to(player[:, None, None, :], ai.shape).copy()
+        for _ in range(self.horizon):
+            stance = rng.integers(0, len(POSTURES), size=shape)
+            luck = rng.lognormal(0.0, self.noise, size=(2,) + shape)
+            ai_losses = self.beta * player * OFFENSE[stance] * exposure * luck[0]
+            player_losses = self.alpha * ai * offense * EXPOSURE[stance] * luck[1]
+            np.maximum(ai - ai_losses, 0.0, out=ai)
+            np.maximum(player - player_losses, 0.0, out=player)
+        return (ai - player).sum(axis=3)
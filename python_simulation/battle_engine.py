@@ -0,0 +1,287 @@
+import json
+
+import numpy as np
+
+from density_field import DensityField, field_losses, move_toward_field
+from profiling import NULL_PROFILER
+from random_streams import RandomStreams
+from spatial import UniformGrid
+from unit_store import UnitStore
+
+
+# ------------------ Default Simulation Parameters (Ia Drang Valley) ------------------
+DEFAULT_PARAMETERS = {
+    "num_units_blue": 100,
+    "num_units_red": 300,
+    "battlefield_size": 10,
+    "fight_radius": 1.5,
+    "step_size": 0.2,
+    "terrain_variation": 2,
+    "reinforcement_rate_blue": None,  # Defaults to 2% of the starting blue force per frame
+    "reinforcement_rate_red": None,   # Defaults to 3% of the starting red force per frame
+    "alpha": 0.002,
+    "beta": 0.001,
+    "engagement": "global",         # "global": losses from army sizes; "local": only units within fight_radius fight
+    "elevation_advantage": 0.0,     # Local mode: fire is exp(elevation_advantage * height gain in km) times as deadly
+    "large_scale": False,           # Move and engage against density fields instead of exact nearest enemies
+    "field_cells": 256,             # Density field resolution per side of the battlefield in large-scale mode
+}
+ENGAGEMENT_MODES = ("global", "local")
+INTEGER_PARAMETERS = ("num_units_blue", "num_units_red", "field_cells")
+
+
+# ------------------ Parameter Overrides (NAME=VALUE) ------------------
+def parse_parameter(text):
+    """
+    Parses one NAME=VALUE override into (name, value). true/false become booleans,
+    numbers become floats (ints for INTEGER_PARAMETERS) and anything else stays a
+    string, for mode switches such as engagement=local.
+    Raises ValueError for malformed text or a name not in DEFAULT_PARAMETERS.
+    """
+    name, sep, value = text.partition("=")
+    if not sep or name not in DEFAULT_PARAMETERS:
+        raise ValueError(f"expected NAME=VALUE with NAME in: {', '.join(DEFAULT_PARAMETERS)} (got {text!r})")
+    if value.lower() in ("true", "false"):
+        return name, value.lower() == "true"
+    try:
+        number = float(value)
+    except ValueError:
+        return name, value
+    return name, int(number) if name in INTEGER_PARAMETERS else number
+
+
+def parse_parameters(overrides):
+    """
+    {name: value} for a list of NAME=VALUE overrides; a later override of the same name wins.
+    """
+    return dict(parse_parameter(text) for text in overrides)
+
+
+# ------------------ Headless Battle Engine ------------------
+class BattleEngine:
+    """
+    Agent-based model of the Ia Drang battle without any GUI attached.
+    Each side's units live in a UnitStore; each frame both sides close on their
+    nearest enemy and then take Lanchester-style casualties and reinforcements,
+    either from the army totals ("global") or only where units are in contact ("local").
+    With large_scale=True units march on the nearest enemy concentration of a
+    density field instead of the exact nearest enemy, which keeps a million-unit
+    side within a few hundred MB and well under a second per frame.
+    """
+
+    def __init__(self, seed=None, profiler=None, **parameters):
+        unknown = set(parameters) - set(DEFAULT_PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown simulation parameters: {', '.join(sorted(unknown))}")
+
+        params = dict(DEFAULT_PARAMETERS, **parameters)
+        if params["engagement"] not in ENGAGEMENT_MODES:
+            raise ValueError(f"Unknown engagement mode {params['engagement']!r}; expected one of: {', '.join(ENGAGEMENT_MODES)}")
+        if params["reinforcement_rate_blue"] is None:
+            params["reinforcement_rate_blue"] = 0.02 * params["num_units_blue"]
+        if params["reinforcement_rate_red"] is None:
+            params["reinforcement_rate_red"] = 0.03 * params["num_units_red"]
+        self.params = params
+        self.profiler = profiler or NULL_PROFILER
+
+        self.streams = RandomStreams(seed)
+        self.frame = 0
+        self.winner = None
+        self.blue = UnitStore(capacity=2 * int(params["num_units_blue"]))
+        self.red = UnitStore(capacity=2 * int(params["num_units_red"]))
+        self.spawn_units(self.blue, int(params["num_units_blue"]))
+        self.spawn_units(self.red, int(params["num_units_red"]))
+
+    @property
+    def finished(self):
+        return self.winner is not None
+
+    @property
+    def blue_units(self):
+        """
+        Living blue units as an (n, 3) array of x, y, elevation (a copy, for rendering/export).
+        """
+        return self.blue.to_array()
+
+    @property
+    def red_units(self):
+        return self.red.to_array()
+
+    def spawn_units(self, store, count):
+        rng = self.streams.reinforcements
+        size = self.params["battlefield_size"]
+        return store.add(rng.random((count, 2)) * size, rng.random(count) * self.params["terrain_variation"])
+
+    def move_units(self, store, enemy_store):
+        """
+        Advances every living unit one step towards its nearest enemy in a single batched update.
+        """
+        if len(store) == 0 or len(enemy_store) == 0:
+            return
+
+        size = self.params["battlefield_size"]
+        if self.params["large_scale"]:
+            enemy_field = DensityField.from_store(enemy_store, size, self.params["field_cells"])
+            move_toward_field(store, enemy_field, self.params["step_size"])
+            return
+
+        own_slots = store.indices()
+        units = store.positions[own_slots]
+        targets = enemy_store.positions[enemy_store.indices()]
+        nearest, distance = UniformGrid(targets, bounds=(0, size)).nearest(units)
+        moving = distance > 0
+        direction = targets[nearest[moving]] - units[moving]
+        store.positions[own_slots[moving]] = units[moving] + self.params["step_size"] * direction / distance[moving, None]
+
+    def local_losses(self, attackers, defenders, lethality):
+        """
+        Slots of `defenders` killed this frame by `attackers` in local engagement.
+        Every attacker within fight_radius of its nearest defender fires at it with
+        hit probability `lethality`, scaled by exp(elevation_advantage * height gain);
+        a defender facing total hazard h falls with probability 1 - exp(-h).
+        One grid query per side keeps this O(N) however large the armies are.
+        In large-scale mode the mean-field version (density_field.field_losses) is used.
+        """
+        if len(attackers) == 0 or len(defenders) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        params = self.params
+        if params["large_scale"]:
+            field = DensityField.from_store(attackers, params["battlefield_size"], params["field_cells"],
+                                            centroids=False, elevation=bool(params["elevation_advantage"]))
+            return field_losses(self.streams.casualties, field, defenders, lethality, params["fight_radius"],
+                                params["elevation_advantage"])
+
+        attacker_slots, defender_slots = attackers.indices(), defenders.indices()
+        targets = defenders.positions[defender_slots]
+        grid = UniformGrid(targets, bounds=(0, params["battlefield_size"]))
+        nearest, distance = grid.nearest(attackers.positions[attacker_slots])
+        firing = distance <= params["fight_radius"]
+        if not firing.any():
+            return np.empty(0, dtype=np.int64)
+
+        aimed = nearest[firing]
+        hazard = np.full(len(aimed), float(lethality))
+        if params["elevation_advantage"]:
+            gain = attackers.elevation[attacker_slots[firing]] - defenders.elevation[defender_slots[aimed]]
+            hazard *= np.exp(params["elevation_advantage"] * gain)
+        hazard = np.bincount(aimed, weights=hazard, minlength=len(defender_slots))
+
+        engaged = np.flatnonzero(hazard)
+        falls = self.streams.casualties.random(len(engaged)) < -np.expm1(-hazard[engaged])
+        return defender_slots[engaged[falls]]
+
+    def engage_units(self):
+        """
+        Applies one frame of casualties and reinforcements and returns the frame report.
+        """
+        params = self.params
+        blue, red = self.blue, self.red
+
+        with self.profiler.phase("engage"):
+            if params["engagement"] == "local":
+                # Both sides fire at the same moment, so losses are decided before any are removed
+                blue_killed = self.local_losses(red, blue, params["beta"])
+                red_killed = self.local_losses(blue, red, params["alpha"])
+            else:
+                rng = self.streams.casualties
+                blue_killed = rng.choice(blue.indices(), min(int(params["beta"] * len(red)), len(blue)), replace=False)
+                red_killed = rng.choice(red.indices(), min(int(params["alpha"] * len(blue)), len(red)), replace=False)
+            blue.kill(blue_killed)
+            red.kill(red_killed)
+        blue_casualties, red_casualties = len(blue_killed), len(red_killed)
+
+        # A side that loses its last unit has lost the field; no reinforcements arrive after that
+        if len(blue) == 0 or len(red) == 0:
+            if len(blue) == len(red):
+                self.winner = "stalemate"
+            else:
+                self.winner = "blue" if len(blue) else "red"
+            blue_reinforcements = red_reinforcements = 0
+        else:
+            blue_reinforcements = int(params["reinforcement_rate_blue"])
+            red_reinforcements = int(params["reinforcement_rate_red"])
+            with self.profiler.phase("reinforce"):
+                self.spawn_units(blue, blue_reinforcements)
+                self.spawn_units(red, red_reinforcements)
+
+        return {
+            "frame": self.frame,
+            "blue": len(blue),
+            "red": len(red),
+            "blue_casualties": blue_casualties,
+            "red_casualties": red_casualties,
+            "blue_reinforcements": blue_reinforcements,
+            "red_reinforcements": red_reinforcements,
+            "winner": self.winner,
+        }
+
+    def step(self):
+        """
+        Runs one frame: blue moves, red moves against the new blue positions, then engagement.
+        Returns None once the battle is over.
+        """
+        if self.finished:
+            return None
+        profiler = self.profiler
+        with profiler.phase("move"):
+            self.move_units(self.blue, self.red)
+            self.move_units(self.red, self.blue)
+        if profiler.enabled:
+            profiler.count("frames")
+            profiler.count("unit_frames", len(self.blue) + len(self.red))
+        report = self.engage_units()
+        self.frame += 1
+        return report
+
+    def run(self, n_frames, callback=None):
+        """
+        Steps up to n_frames (stopping early on a decisive result) and returns the frame reports.
+        """
+        reports = []
+        for _ in range(n_frames):
+            report = self.step()
+            if report is None:
+                break
+            reports.append(report)
+            if callback is not None:
+                callback(report)
+        return reports
+
+    def outcome(self):
+        """
+        Winner of the battle so far: decisive if a side was wiped out, otherwise by remaining force.
+        """
+        if self.winner is not None:
+            return self.winner
+        if len(self.blue) > len(self.red):
+            return "blue"
+        if len(self.red) > len(self.blue):
+            return "red"
+        return "stalemate"
+
+    # ------------------ Checkpoint / Resume ------------------
+    def save_checkpoint(self, path):
+        """
+        Writes the full engine state (parameters, frame, both unit stores and every
+        random stream) to one compressed .npz file. Resuming from it continues the
+        battle bit-for-bit as if it had never stopped.
+        """
+        meta = {"params": self.params, "frame": self.frame, "winner": self.winner, "streams": self.streams.state()}
+        with open(path, "wb") as file:
+            np.savez_compressed(file, meta=np.array(json.dumps(meta)),
+                                **self.blue.state("blue"), **self.red.state("red"))
+
+    @classmethod
+    def load_checkpoint(cls, path, profiler=None):
+        with np.load(path, allow_pickle=False) as arrays:
+            meta = json.loads(str(arrays["meta"]))
+            engine = cls.__new__(cls)
+            engine.params = meta["params"]
+            engine.profiler = profiler or NULL_PROFILER
+            engine.streams = RandomStreams.from_state(meta["streams"])
+            engine.frame = meta["frame"]
+            engine.winner = meta["winner"]
+            engine.blue = UnitStore.from_state(arrays, "blue")
+            engine.red = UnitStore.from_state(arrays, "red")
+        return engine
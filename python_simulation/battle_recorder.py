@@ -0,0 +1,271 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+# One row per frame: unit counts, losses, reinforcements and the centroid of each army
+FRAME_DTYPE = np.dtype([
+    ("frame", np.int32),
+    ("blue", np.int32),
+    ("red", np.int32),
+    ("blue_casualties", np.int32),
+    ("red_casualties", np.int32),
+    ("blue_reinforcements", np.int32),
+    ("red_reinforcements", np.int32),
+    ("blue_centroid_x", np.float32),
+    ("blue_centroid_y", np.float32),
+    ("red_centroid_x", np.float32),
+    ("red_centroid_y", np.float32),
+])
+# One row per living unit per frame (optional); side is 0 for blue and 1 for red
+POSITION_DTYPE = np.dtype([
+    ("frame", np.int32),
+    ("side", np.int8),
+    ("x", np.float32),
+    ("y", np.float32),
+    ("elevation", np.float32),
+])
+TABLES = {"frames": FRAME_DTYPE, "positions": POSITION_DTYPE}
+FORMATS = ("csv", "parquet", "arrow")
+
+
+# ------------------ Chunked Table Writer ------------------
+class _TableWriter:
+    """
+    Buffers rows of one table in a preallocated chunk and appends each full chunk to
+    a raw binary file (for memory-mapping) plus any of CSV, Parquet and Arrow IPC.
+    """
+
+    def __init__(self, directory, name, dtype, chunk_rows, formats):
+        self.name = name
+        self.dtype = dtype
+        self.buffer = np.empty(chunk_rows, dtype=dtype)
+        self.filled = 0
+        self.rows = 0
+        self.directory = directory
+        self.raw = open(os.path.join(directory, f"{name}.bin"), "wb")
+        self.csv = None
+        self.parquet = None
+        self.arrow = None
+        self.arrow_sink = None
+
+        if "csv" in formats:
+            self.csv = open(os.path.join(directory, f"{name}.csv"), "w")
+            self.csv.write(",".join(dtype.names) + "\n")
+        if "parquet" in formats or "arrow" in formats:
+            pa = _require_pyarrow()
+            schema = pa.schema([(field, pa.from_numpy_dtype(dtype[field])) for field in dtype.names])
+            if "parquet" in formats:
+                import pyarrow.parquet as pq
+                self.parquet = pq.ParquetWriter(os.path.join(directory, f"{name}.parquet"), schema)
+            if "arrow" in formats:
+                self.arrow_sink = pa.OSFile(os.path.join(directory, f"{name}.arrow"), "wb")
+                self.arrow = pa.ipc.new_file(self.arrow_sink, schema)
+
+    def append(self, rows):
+        """
+        Copies rows into the chunk buffer, flushing every time it fills up.
+        """
+        start = 0
+        while start < len(rows):
+            take = min(len(rows) - start, len(self.buffer) - self.filled)
+            self.buffer[self.filled:self.filled + take] = rows[start:start + take]
+            self.filled += take
+            start += take
+            if self.filled == len(self.buffer):
+                self.flush()
+
+    def flush(self):
+        if self.filled == 0:
+            return
+        chunk = self.buffer[:self.filled]
+        chunk.tofile(self.raw)
+        self.raw.flush()
+        if self.csv is not None:
+            formats = ["%.6g" if self.dtype[field].kind == "f" else "%d" for field in self.dtype.names]
+            np.savetxt(self.csv, chunk, fmt=formats, delimiter=",")
+        if self.parquet is not None or self.arrow is not None:
+            import pyarrow as pa
+            batch = pa.record_batch([pa.array(chunk[field]) for field in self.dtype.names], names=list(self.dtype.names))
+            if self.parquet is not None:
+                self.parquet.write_batch(batch)
+            if self.arrow is not None:
+                self.arrow.write_batch(batch)
+        self.rows += self.filled
+        self.filled = 0
+
+    def close(self):
+        self.flush()
+        self.raw.close()
+        if self.csv is not None:
+            self.csv.close()
+        if self.parquet is not None:
+            self.parquet.close()
+        if self.arrow is not None:
+            self.arrow.close()
+            self.arrow_sink.close()
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as error:
+        raise ImportError("Parquet/Arrow output needs pyarrow: pip install pyarrow") from error
+    return pyarrow
+
+
+# ------------------ Battle Recorder ------------------
+class BattleRecorder:
+    """
+    Streams per-frame battle state to disk for the Mathematica analysis pipeline.
+    Memory stays bounded by chunk_rows per table no matter how long the battle runs.
+    Use as engine.run(n, callback=recorder.callback(engine)) or call record() per frame.
+    """
+
+    def __init__(self, directory, formats=("csv",), chunk_rows=65536, record_positions=False, parameters=None):
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown export formats: {', '.join(sorted(unknown))}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.formats = tuple(formats)
+        self.parameters = parameters
+        self.writers = {"frames": _TableWriter(directory, "frames", FRAME_DTYPE, chunk_rows, formats)}
+        if record_positions:
+            self.writers["positions"] = _TableWriter(directory, "positions", POSITION_DTYPE, chunk_rows, formats)
+        self._row = np.zeros(1, dtype=FRAME_DTYPE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def callback(self, engine):
+        return lambda report: self.record(engine, report)
+
+    def record(self, engine, report):
+        with engine.profiler.phase("io"):
+            self._record(engine, report)
+
+    def _record(self, engine, report):
+        row = self._row
+        for field in ("frame", "blue", "red", "blue_casualties", "red_casualties",
+                      "blue_reinforcements", "red_reinforcements"):
+            row[field] = report[field]
+        for side, store in (("blue", engine.blue), ("red", engine.red)):
+            positions = store.positions[store.indices()]
+            centroid = positions.mean(axis=0) if len(positions) else (np.nan, np.nan)
+            row[f"{side}_centroid_x"], row[f"{side}_centroid_y"] = centroid
+        self.writers["frames"].append(row)
+
+        if "positions" in self.writers:
+            for code, store in enumerate((engine.blue, engine.red)):
+                slots = store.indices()
+                rows = np.empty(len(slots), dtype=POSITION_DTYPE)
+                rows["frame"] = report["frame"]
+                rows["side"] = code
+                rows["x"], rows["y"] = store.positions[slots, 0], store.positions[slots, 1]
+                rows["elevation"] = store.elevation[slots]
+                self.writers["positions"].append(rows)
+
+    def close(self):
+        meta = {"formats": list(self.formats), "parameters": self.parameters, "tables": {}}
+        for name, writer in self.writers.items():
+            writer.close()
+            meta["tables"][name] = {"rows": writer.rows, "columns": list(writer.dtype.names),
+                                    "dtype": [(field, writer.dtype[field].str) for field in writer.dtype.names]}
+        with open(os.path.join(self.directory, "meta.json"), "w") as file:
+            json.dump(meta, file, indent=4)
+
+
+# ------------------ Memory-Mapped Reader ------------------
+class BattleRecording:
+    """
+    Opens a recorded battle without loading it: each table is a numpy.memmap over
+    its .bin file, so slicing a 10M-row run only pages in the rows you touch.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), "r") as file:
+            self.meta = json.load(file)
+        self.tables = {}
+        for name, info in self.meta["tables"].items():
+            dtype = np.dtype([(field, code) for field, code in info["dtype"]])
+            path = os.path.join(directory, f"{name}.bin")
+            if info["rows"]:
+                self.tables[name] = np.memmap(path, dtype=dtype, mode="r", shape=(info["rows"],))
+            else:
+                self.tables[name] = np.empty(0, dtype=dtype)
+
+    @property
+    def frames(self):
+        return self.tables["frames"]
+
+    @property
+    def positions(self):
+        if "positions" not in self.tables:
+            raise KeyError("This recording was made without record_positions=True")
+        return self.tables["positions"]
+
+    def frame_range(self, start, stop):
+        """
+        Frame rows with start <= frame < stop (frames are stored in order).
+        """
+        frame = self.frames["frame"]
+        return self.frames[np.searchsorted(frame, start):np.searchsorted(frame, stop)]
+
+    def positions_at(self, frame):
+        """
+        Unit rows of one frame, found by binary search over the memory-mapped column.
+        """
+        column = self.positions["frame"]
+        return self.positions[np.searchsorted(column, frame):np.searchsorted(column, frame, side="right")]
+
+    def arrow_table(self, name="frames"):
+        """
+        The Arrow IPC copy of a table, memory-mapped through pyarrow (needs format "arrow").
+        """
+        pa = _require_pyarrow()
+        source = pa.memory_map(os.path.join(self.directory, f"{name}.arrow"), "r")
+        return pa.ipc.open_file(source).read_all()
+
+
+def record_battle(directory, n_frames=200, seed=None, formats=("csv",), record_positions=False,
+                  chunk_rows=65536, profiler=None, **parameters):
+    """
+    Runs a headless battle and streams it to `directory`. Returns the engine.
+    """
+    from battle_engine import BattleEngine
+
+    engine = BattleEngine(seed=seed, profiler=profiler, **parameters)
+    with BattleRecorder(directory, formats, chunk_rows, record_positions, dict(parameters, seed=seed)) as recorder:
+        engine.run(n_frames, callback=recorder.callback(engine))
+    return engine
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record a headless battle for the Mathematica pipeline.")
+    parser.add_argument("directory", help="output directory")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--format", dest="formats", nargs="+", choices=FORMATS, default=["csv"])
+    parser.add_argument("--positions", action="store_true", help="also record every unit's position each frame")
+    parser.add_argument("--chunk-rows", type=int, default=65536)
+    parser.add_argument("--profile", default=None, metavar="PATH", help="write a per-phase JSON profile of the run")
+    args = parser.parse_args(argv)
+
+    from profiling import Profiler
+
+    profiler = Profiler() if args.profile else None
+    engine = record_battle(args.directory, args.frames, args.seed, args.formats, args.positions, args.chunk_rows,
+                           profiler)
+    print(f"Recorded {engine.frame} frames to {args.directory}")
+    if profiler is not None:
+        profiler.write_json(args.profile)
+
+
+if __name__ == "__main__":
+    main()
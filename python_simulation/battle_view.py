@@ -0,0 +1,173 @@
+import time
+
+
+# ------------------ Battle Narrative ------------------
+def narrate(report, emit=print, every=20):
+    """
+    Turns an engine frame report into the commander's battle narrative.
+    Lines go to `emit` (print by default) instead of blocking the caller.
+    """
+    frame = report["frame"]
+    if frame % every == 0:
+        emit("\n--------------------------------------------------")
+        emit(f"🪖 **Battle Report at Frame {frame}** 🪖")
+        emit(f"🔵 U.S. Forces Remaining: {report['blue']}")
+        emit(f"🔴 PAVN Forces Remaining: {report['red']}")
+        if report["blue_casualties"] > report["red_casualties"]:
+            emit("💥 The U.S. is losing troops faster. Reinforcements are crucial.")
+        elif report["red_casualties"] > report["blue_casualties"]:
+            emit("🔥 PAVN forces are taking heavier losses, but their reinforcements are sustaining them.")
+        if report["blue"] < 50:
+            emit("⚠️ The U.S. is critically low on troops. Air support is needed!")
+        elif report["red"] < 150:
+            emit("🛑 PAVN forces are shrinking, but they still have numbers.")
+
+    if report["winner"] == "red":
+        emit("⚠️ U.S. Forces have been **defeated**! The PAVN controls the battlefield.")
+    elif report["winner"] == "blue":
+        emit("✅ The U.S. Forces have **won**! PAVN forces are retreating.")
+
+
+def final_report(engine, emit=print):
+    emit("\n--------------------------------------------------")
+    emit("🏆 **Final Battle Report** 🏆")
+    outcome = engine.outcome()
+    if outcome == "blue":
+        emit("✅ The U.S. Forces **secured victory** after sustained combat.")
+    elif outcome == "red":
+        emit("⚠️ The PAVN **controlled the battlefield** and forced the U.S. to withdraw.")
+    else:
+        emit("🔄 The battle ended in a **stalemate**, with heavy losses on both sides.")
+
+
+# ------------------ Fixed-Timestep Simulation Clock ------------------
+class SimulationClock:
+    """
+    Advances an engine in fixed one-frame steps independently of rendering.
+    With sim_rate=None physics runs as fast as possible within each render
+    interval; with a sim_rate (frames per second) it keeps to wall-clock time.
+    Either way the renderer only ever draws the latest state, so frames are
+    skipped rather than queued when drawing falls behind. While `paused` is set
+    no steps are taken.
+    """
+
+    def __init__(self, engine, n_frames, sim_rate=None, on_report=None, max_steps_per_tick=1000):
+        self.engine = engine
+        self.n_frames = n_frames
+        self.sim_rate = sim_rate
+        self.on_report = on_report
+        self.max_steps_per_tick = max_steps_per_tick
+        self.start = None
+        self.paused = False
+        self._paused_at = None
+
+    @property
+    def done(self):
+        return self.engine.finished or self.engine.frame >= self.n_frames
+
+    def advance(self, budget):
+        """
+        Runs the physics steps due now, spending at most `budget` seconds.
+        Returns the number of steps taken.
+        """
+        now = time.perf_counter()
+        if self.start is None:
+            self.start = now
+        if self.paused:
+            if self._paused_at is None:
+                self._paused_at = now
+            return 0
+        if self._paused_at is not None:
+            self.start += now - self._paused_at  # Paused time does not count towards sim_rate
+            self._paused_at = None
+        if self.sim_rate is None:
+            due = self.max_steps_per_tick
+        else:
+            due = min(int((now - self.start) * self.sim_rate) + 1 - self.engine.frame, self.max_steps_per_tick)
+
+        deadline = now + budget
+        steps = 0
+        while steps < due and not self.done:
+            report = self.engine.step()
+            steps += 1
+            if report is not None and self.on_report is not None:
+                self.on_report(report)
+            if time.perf_counter() >= deadline:
+                break
+        return steps
+
+
+# ------------------ Blitted 3D Viewer ------------------
+WATCH_SIM_RATE = 10  # Physics frames per second in the interactive viewer (the old 100 ms per frame)
+
+
+class BattleViewer:
+    """
+    Matplotlib view of a BattleEngine. The scatter artists, axes and legend are
+    built once; each render only swaps the scatter offsets and the title text and
+    is blitted, while the SimulationClock runs physics in between, at `sim_rate`
+    frames per second so a battle plays out at a watchable pace.
+    """
+
+    def __init__(self, engine, n_frames=200, target_fps=30, sim_rate=WATCH_SIM_RATE, on_report=None):
+        self.engine = engine
+        self.target_fps = target_fps
+        self.clock = SimulationClock(engine, n_frames, sim_rate, on_report)
+        self.rendered_frames = 0
+        self.animation = None
+
+    def build(self):
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.mplot3d import Axes3D
+
+        params = self.engine.params
+        self.fig = plt.figure()
+        ax = self.ax = self.fig.add_subplot(111, projection='3d')
+        ax.set_xlim(0, params["battlefield_size"])
+        ax.set_ylim(0, params["battlefield_size"])
+        ax.set_zlim(0, params["terrain_variation"])
+        ax.set_xlabel("X Position (km)")
+        ax.set_ylabel("Y Position (km)")
+        ax.set_zlabel("Elevation (km)")
+        self.blue_scatter = ax.scatter([], [], [], color='blue', label='U.S. Army (Blue)', animated=True)
+        self.red_scatter = ax.scatter([], [], [], color='red', label='PAVN Forces (Red)', animated=True)
+        self.title = ax.text2D(0.5, 1.0, "", transform=ax.transAxes, ha="center", animated=True)
+        ax.legend()
+        self.draw_state()
+        return self.fig
+
+    def draw_state(self):
+        engine = self.engine
+        blue = engine.blue.positions[engine.blue.indices()]
+        red = engine.red.positions[engine.red.indices()]
+        self.blue_scatter._offsets3d = (blue[:, 0], blue[:, 1], engine.blue.live_elevation())
+        self.red_scatter._offsets3d = (red[:, 0], red[:, 1], engine.red.live_elevation())
+        # Animated artists are skipped by the full draw, so project the new offsets here;
+        # otherwise draw_artist keeps blitting the positions cached at the last full draw
+        if self.ax.M is not None:  # The view matrix exists once the figure has been drawn
+            self.blue_scatter.do_3d_projection()
+            self.red_scatter.do_3d_projection()
+        self.title.set_text(f"Battle of Ia Drang Valley - Frame {engine.frame}")
+        return self.blue_scatter, self.red_scatter, self.title
+
+    def _frames(self):
+        while not self.clock.done:
+            yield self.engine.frame
+
+    def _update(self, _):
+        self.clock.advance(budget=0.8 / self.target_fps)
+        self.rendered_frames += 1
+        with self.engine.profiler.phase("render"):
+            return self.draw_state()
+
+    def show(self):
+        """
+        Opens the window and blocks until it is closed.
+        """
+        import matplotlib.pyplot as plt
+        from matplotlib.animation import FuncAnimation
+
+        self.build()
+        self.animation = FuncAnimation(self.fig, self._update, frames=self._frames, interval=1000 / self.target_fps,
+                                       blit=True, repeat=False, cache_frame_data=False)
+        plt.show()
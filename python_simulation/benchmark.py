@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from battle_engine import BattleEngine
+from profiling import NULL_PROFILER, Profiler
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000, 1000000)
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+
+# ------------------ Scaling Benchmark ------------------
+def frames_for(size, budget_unit_frames=2_000_000, most=200, least=3):
+    """
+    Picks enough frames for a stable measurement without letting the 1e6-unit case run for minutes.
+    """
+    return max(least, min(most, budget_unit_frames // size))
+
+
+def benchmark_size(total_units, n_frames, seed=0, memory_frames=3, **parameters):
+    """
+    Runs the engine headlessly with total_units split 1:3 blue:red (the Ia Drang
+    ratio) and returns throughput, peak memory and the per-phase profile.
+    Throughput is timed without tracemalloc, which slows the engine down by ~15%.
+    Peak memory is measured afterwards over `memory_frames` more traced frames of
+    the same battle, where the armies are at their largest: the unit stores plus
+    the peak of everything a frame allocates (nothing, if the battle already ended).
+    """
+    blue = max(1, total_units // 4)
+    profiler = Profiler()
+    engine = BattleEngine(seed=seed, profiler=profiler, num_units_blue=blue, num_units_red=total_units - blue,
+                          **parameters)
+    start = time.perf_counter()
+    engine.run(n_frames)
+    elapsed = time.perf_counter() - start
+
+    engine.profiler = NULL_PROFILER  # The traced frames are not part of the profile
+    resident = engine.blue.nbytes + engine.red.nbytes
+    tracemalloc.start()
+    try:
+        engine.run(memory_frames)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    peak += resident
+
+    profile = profiler.report()
+    frames = profile["counters"].get("frames", 0)
+    unit_frames = profile["counters"].get("unit_frames", 0)
+    return {
+        "units": total_units,
+        "frames": frames,
+        "seconds": elapsed,
+        "frames_per_second": frames / elapsed if elapsed > 0 else float("inf"),
+        "unit_frames_per_second": unit_frames / elapsed if elapsed > 0 else float("inf"),
+        "peak_memory_bytes": peak,
+        "profile": profile,
+    }
+
+
+def run_suite(sizes=DEFAULT_SIZES, frames=None, seed=0, emit=print, **parameters):
+    results = []
+    for size in sizes:
+        n_frames = frames or frames_for(size)
+        result = benchmark_size(size, n_frames, seed, **parameters)
+        results.append(result)
+        emit(f"{size:>9} units: {result['frames_per_second']:9.2f} frames/s  "
+             f"{result['unit_frames_per_second']:12.0f} unit-frames/s  "
+             f"peak {result['peak_memory_bytes'] / 2**20:8.1f} MiB  ({result['frames']} frames)")
+    return {
+        "python": sys.version.split()[0],
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "parameters": parameters,
+        "results": results,
+    }
+
+
+# ------------------ Regression Check ------------------
+def compare(suite, baseline, tolerance=0.2):
+    """
+    Returns a list of regressions: sizes whose throughput dropped, or whose peak
+    memory grew, by more than `tolerance` relative to the baseline.
+    """
+    previous = {entry["units"]: entry for entry in baseline["results"]}
+    regressions = []
+    for entry in suite["results"]:
+        old = previous.get(entry["units"])
+        if old is None:
+            continue
+        for metric in ("frames_per_second", "unit_frames_per_second"):
+            if entry[metric] < old[metric] * (1 - tolerance):
+                regressions.append(f"{entry['units']} units: {metric} {entry[metric]:.1f} < baseline {old[metric]:.1f}")
+        if entry["peak_memory_bytes"] > old["peak_memory_bytes"] * (1 + tolerance):
+            regressions.append(f"{entry['units']} units: peak memory {entry['peak_memory_bytes']} B "
+                               f"> baseline {old['peak_memory_bytes']} B")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless scaling benchmark for the battle engine.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="total unit counts")
+    parser.add_argument("--frames", type=int, default=None, help="frames per size (default: scaled to size)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON to compare against or save")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--large-scale", action="store_true", help="benchmark the density-field mode")
+    parser.add_argument("--json", dest="json_path", default=None, help="write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+
+    suite = run_suite(args.sizes, args.frames, args.seed, large_scale=args.large_scale)
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(suite, file, indent=4)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(suite, file, indent=4)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline, "r") as file:
+        baseline = json.load(file)
+    regressions = compare(suite, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print("No regressions against the baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
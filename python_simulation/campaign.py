@@ -0,0 +1,137 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from battle_engine import BattleEngine
+
+# Campaign battles are fought with the forces actually committed to a front: losses
+# come only from units in contact, and nobody arrives from off the map mid-turn
+CAMPAIGN_PARAMETERS = {
+    "engagement": "local",
+    "reinforcement_rate_blue": 0,
+    "reinforcement_rate_red": 0,
+}
+ENEMY_RATIO = 3.0  # PAVN strength per U.S. soldier when no enemy estimate is given (Ia Drang)
+
+
+# ------------------ One Front ------------------
+def fight_front(front, troops, enemy, seed, n_frames=200, troops_per_unit=1, parameters=None):
+    """
+    Fights one front's battle with an agent per `troops_per_unit` soldiers and
+    returns the survivors on both sides in soldiers, never more than were committed.
+    """
+    blue_units = max(1, int(np.ceil(troops / troops_per_unit)))
+    red_units = max(1, int(np.ceil(enemy / troops_per_unit)))
+    params = dict(CAMPAIGN_PARAMETERS, **(parameters or {}))
+    params.update(num_units_blue=blue_units, num_units_red=red_units)
+
+    engine = BattleEngine(seed=seed, **params)
+    engine.run(n_frames)
+    survivors = min(troops, int(round(len(engine.blue) * troops / blue_units)))
+    enemy_survivors = min(enemy, int(round(len(engine.red) * enemy / red_units)))
+    return {
+        "front": front,
+        "troops": troops,
+        "enemy": enemy,
+        "survivors": survivors,
+        "enemy_survivors": enemy_survivors,
+        "losses": troops - survivors,
+        "enemy_losses": enemy - enemy_survivors,
+        "winner": engine.outcome(),
+        "decisive": engine.finished,
+        "frames": engine.frame,
+    }
+
+
+# ------------------ Concurrent Campaign Turn ------------------
+def run_campaign_turn(allocations, enemy=None, seed=None, n_frames=200, workers=None, troops_per_unit=1,
+                      parameters=None):
+    """
+    Fights one battle per front at the same time, each in its own process, so a
+    turn takes about as long as its slowest front. Returns {front: result}.
+    `allocations` maps fronts to committed troops (fronts with none are skipped);
+    `enemy` maps fronts to enemy troops and defaults to ENEMY_RATIO times ours.
+    Every front gets its own child seed, so results do not depend on `workers`.
+    """
+    fronts = [front for front, troops in allocations.items() if troops > 0]
+    if not fronts:
+        return {}
+    enemy = enemy or {}
+    enemy_troops = {front: int(enemy.get(front, round(allocations[front] * ENEMY_RATIO))) for front in fronts}
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    seeds = dict(zip(fronts, root.spawn(len(fronts))))
+    workers = min(len(fronts), workers or os.cpu_count() or 1)
+
+    def task(front):
+        return (front, allocations[front], enemy_troops[front], seeds[front], n_frames, troops_per_unit, parameters)
+
+    if workers == 1:
+        results = {front: fight_front(*task(front)) for front in fronts}
+    else:
+        # Biggest fronts start first so a large battle queued last cannot stretch the turn
+        order = sorted(fronts, key=lambda front: allocations[front] + enemy_troops[front], reverse=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {front: pool.submit(fight_front, *task(front)) for front in order}
+            results = {front: futures[front].result() for front in fronts}
+    return results
+
+
+def apply_results(allocations, results):
+    """
+    Takes a turn's losses off the allocations (in place) and returns the total
+    troops lost. Losses are subtracted from the current values rather than the
+    survivors written over them, so troops moved while the turn was being fought
+    are kept.
+    """
+    lost = 0
+    for front, result in results.items():
+        allocations[front] = max(0, allocations.get(front, 0) - result["losses"])
+        lost += result["losses"]
+    return lost
+
+
+def format_results(results):
+    lines = ["⚔️ Campaign Turn Report:"]
+    for front, result in results.items():
+        if result["decisive"] and result["winner"] == "blue":
+            status = "✅ enemy routed"
+        elif result["decisive"] and result["winner"] == "red":
+            status = "⚠️ overrun"
+        else:
+            status = "🔄 holding the line"
+        lines.append(f"- {front}: {status} - lost {result['losses']} of {result['troops']}, "
+                     f"enemy lost {result['enemy_losses']} of {result['enemy']}")
+    return "\n".join(lines)
+
+
+# ------------------ Command Line ------------------
+def parse_front(text):
+    name, sep, value = text.partition("=")
+    if not sep or not name:
+        raise argparse.ArgumentTypeError("expected FRONT=TROOPS")
+    return name, int(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fight one campaign turn: a concurrent battle per front.")
+    parser.add_argument("--front", dest="fronts", type=parse_front, action="append", default=[],
+                        metavar="FRONT=TROOPS", help="troops committed to a front (repeatable)")
+    parser.add_argument("--enemy", dest="enemy", type=parse_front, action="append", default=[],
+                        metavar="FRONT=TROOPS", help="enemy strength on a front (default: 3x ours)")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--troops-per-unit", type=int, default=1, help="soldiers represented by one agent")
+    args = parser.parse_args(argv)
+
+    allocations = dict(args.fronts) or {"Northern Front": 100, "Eastern Front": 100, "Southern Front": 100}
+    results = run_campaign_turn(allocations, dict(args.enemy), args.seed, args.frames, args.workers,
+                                args.troops_per_unit)
+    print(format_results(results))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import numpy as np
+
+from spatial import UniformGrid
+
+# Units processed per chunk, which bounds every per-unit scratch array (~64k float32 rows)
+FIELD_CHUNK = 1 << 16
+
+
+# ------------------ Density Field (Far-Field Aggregation) ------------------
+class DensityField:
+    """
+    One side's units aggregated on a cells x cells grid over the battlefield:
+    unit counts plus summed positions and elevation per cell. Building it is O(N)
+    (chunked bincounts); afterwards every question the engine asks ("where is the
+    nearest enemy concentration?", "how many enemies are within fight_radius?")
+    costs O(cells^2) once per frame plus O(1) per unit.
+    """
+
+    def __init__(self, size, cells):
+        self.size = float(size)
+        self.cells = int(cells)
+        self.cell_size = self.size / self.cells
+        n = self.cells * self.cells
+        self.count = np.zeros(n)
+        self.sum_x = np.zeros(n)
+        self.sum_y = np.zeros(n)
+        self.sum_elevation = np.zeros(n)
+        self._targets = None
+
+    @classmethod
+    def from_store(cls, store, size, cells, centroids=True, elevation=False):
+        """
+        Aggregates a UnitStore's living units. Summed positions (needed by targets())
+        and summed elevation are only accumulated when asked for.
+        """
+        field = cls(size, cells)
+        n = field.cells * field.cells
+        slots = store.indices()
+        for start in range(0, len(slots), FIELD_CHUNK):
+            chunk = slots[start:start + FIELD_CHUNK]
+            positions = store.positions[chunk]
+            ids = field.cell_ids(positions)
+            field.count += np.bincount(ids, minlength=n)
+            if centroids:
+                field.sum_x += np.bincount(ids, weights=positions[:, 0], minlength=n)
+                field.sum_y += np.bincount(ids, weights=positions[:, 1], minlength=n)
+            if elevation:
+                field.sum_elevation += np.bincount(ids, weights=store.elevation[chunk], minlength=n)
+        return field
+
+    def cell_ids(self, positions):
+        coords = (positions * np.float32(self.cells / self.size)).astype(np.int32)
+        np.clip(coords, 0, self.cells - 1, out=coords)
+        return coords[:, 0] * self.cells + coords[:, 1]
+
+    def targets(self):
+        """
+        For every cell, the centroid of the occupied cell nearest to its centre, as a
+        (cells^2, 2) float32 table. Units look up their own cell to find where to march.
+        """
+        if self._targets is None:
+            occupied = np.flatnonzero(self.count)
+            centroids = np.column_stack((self.sum_x[occupied], self.sum_y[occupied])) / self.count[occupied, None]
+            centres = (np.arange(self.cells) + 0.5) * self.cell_size
+            cx, cy = np.meshgrid(centres, centres, indexing="ij")
+            nearest, _ = UniformGrid(centroids, bounds=(0, self.size)).nearest(np.column_stack((cx.ravel(), cy.ravel())))
+            self._targets = centroids[nearest].astype(np.float32)
+        return self._targets
+
+    def box_sum(self, values, radius):
+        """
+        Sum of a per-cell quantity over the square of cells within `radius` (km)
+        of each cell, via a summed-area table.
+        """
+        r = int(np.ceil(radius / self.cell_size))
+        grid = values.reshape(self.cells, self.cells)
+        table = np.zeros((self.cells + 1, self.cells + 1))
+        table[1:, 1:] = grid.cumsum(axis=0).cumsum(axis=1)
+        index = np.arange(self.cells)
+        lo, hi = np.clip(index - r, 0, self.cells), np.clip(index + r + 1, 0, self.cells)
+        return (table[hi][:, hi] - table[lo][:, hi] - table[hi][:, lo] + table[lo][:, lo]).ravel()
+
+
+# ------------------ Field-Based Movement and Engagement ------------------
+def move_toward_field(store, enemy_field, step_size):
+    """
+    Steps every living unit towards the nearest enemy concentration of its cell,
+    a chunk of units at a time.
+    """
+    targets = enemy_field.targets()
+    step = np.float32(step_size)
+    slots = store.indices()
+    for start in range(0, len(slots), FIELD_CHUNK):
+        chunk = slots[start:start + FIELD_CHUNK]
+        positions = store.positions[chunk]
+        direction = targets[enemy_field.cell_ids(positions)] - positions
+        distance = np.sqrt(np.einsum("ij,ij->i", direction, direction))
+        # A unit already standing on its target gets a zero scale instead of a masked update
+        scale = np.divide(step, distance, out=np.zeros_like(distance), where=distance > 0)
+        positions += direction * scale[:, None]
+        store.positions[chunk] = positions
+
+
+def field_losses(rng, attacker_field, defenders, lethality, fight_radius, elevation_advantage=0.0):
+    """
+    Mean-field version of local engagement: attackers within fight_radius of a cell
+    spread their fire over the defenders within fight_radius of it, so a defender
+    faces hazard lethality * attackers_near / defenders_near (times the elevation
+    factor for the attackers' mean height) and falls with probability 1 - exp(-hazard).
+    Returns the killed defender slots.
+    """
+    slots = defenders.indices()
+    if len(slots) == 0 or not attacker_field.count.any():
+        return np.empty(0, dtype=np.int64)
+
+    defender_field = DensityField.from_store(defenders, attacker_field.size, attacker_field.cells, centroids=False)
+    attackers_near = attacker_field.box_sum(attacker_field.count, fight_radius)
+    defenders_near = defender_field.box_sum(defender_field.count, fight_radius)
+    pressure = lethality * np.divide(attackers_near, defenders_near, out=np.zeros_like(attackers_near),
+                                     where=defenders_near > 0)
+    if elevation_advantage:
+        height = np.divide(attacker_field.box_sum(attacker_field.sum_elevation, fight_radius), attackers_near,
+                           out=np.zeros_like(attackers_near), where=attackers_near > 0)
+
+    killed = []
+    for start in range(0, len(slots), FIELD_CHUNK):
+        chunk = slots[start:start + FIELD_CHUNK]
+        ids = defender_field.cell_ids(defenders.positions[chunk])
+        hazard = pressure[ids]
+        if elevation_advantage:
+            hazard = hazard * np.exp(elevation_advantage * (height[ids] - defenders.elevation[chunk]))
+        killed.append(chunk[rng.random(len(chunk)) < -np.expm1(-hazard)])
+    return np.concatenate(killed)
@@ -0,0 +1,212 @@
+import numpy as np
+
+# Outcome codes used by the array functions below
+BLUE_WINS, NO_WINNER, RED_WINS = 1, 0, -1
+
+
+# ------------------ Lanchester's Square Law (Closed Form) ------------------
+def square_law_outcome(A0, B0, alpha, beta, r=0.0):
+    """
+    Closed-form outcome of dA/dt = -beta*B + r*A, dB/dt = -alpha*A + r*B for whole
+    arrays of (A0, B0, alpha, beta, r) at once. A is the blue (U.S.) force, B the red (PAVN).
+
+    A shared growth rate r (the N(t) = N0*e^(r*t) reinforcement model) scales both
+    forces by e^(r*t) and so cannot change who wins, only the survivors' size.
+    Returns (winner, time_to_victory, survivors) where winner holds BLUE_WINS,
+    RED_WINS or NO_WINNER (exact parity), time_to_victory is inf when nobody wins.
+    """
+    A0, B0, alpha, beta, r = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (A0, B0, alpha, beta, r)))
+    k = np.sqrt(alpha * beta)
+    blue_strength = alpha * A0 * A0
+    red_strength = beta * B0 * B0
+
+    winner = np.sign(blue_strength - red_strength).astype(np.int8)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # tanh(k t*) = (loser strength / winner strength)^(1/2)
+        ratio = np.where(winner > 0, np.sqrt(red_strength / blue_strength), np.sqrt(blue_strength / red_strength))
+        time_to_victory = np.where(winner != 0, np.arctanh(np.minimum(ratio, 1.0)) / k, np.inf)
+        # Only one side can fire (alpha or beta is zero): the loser falls linearly
+        one_sided = (k == 0) & (winner != 0)
+        linear = np.where(winner > 0, B0 / (alpha * A0), A0 / (beta * B0))
+        time_to_victory = np.where(one_sided, linear, time_to_victory)
+        survivors = np.where(winner > 0, np.sqrt(np.maximum(A0 * A0 - beta / alpha * B0 * B0, 0.0)),
+                             np.sqrt(np.maximum(B0 * B0 - alpha / beta * A0 * A0, 0.0)))
+        survivors = survivors * np.exp(r * time_to_victory)
+    survivors = np.where(winner != 0, survivors, 0.0)
+    return winner, time_to_victory, survivors
+
+
+def square_law(A0, B0, alpha, beta, t, r=0.0):
+    """
+    Force levels A(t), B(t) of the square law with common growth rate r, evaluated
+    elementwise. Once a side reaches zero it stays there and the winner only grows at rate r.
+    """
+    A0, B0, alpha, beta, r, t = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (A0, B0, alpha, beta, r, t)))
+    winner, time_to_victory, survivors = square_law_outcome(A0, B0, alpha, beta, r)
+    k = np.sqrt(alpha * beta)
+    tt = np.minimum(t, time_to_victory)
+    growth = np.exp(r * tt)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        A = growth * (A0 * np.cosh(k * tt) - np.sqrt(beta / alpha) * B0 * np.sinh(k * tt))
+        B = growth * (B0 * np.cosh(k * tt) - np.sqrt(alpha / beta) * A0 * np.sinh(k * tt))
+    # Only one side can fire (alpha or beta is zero): the other falls linearly
+    one_sided = k == 0
+    A = np.where(one_sided, growth * (A0 - beta * B0 * tt), A)
+    B = np.where(one_sided, growth * (B0 - alpha * A0 * tt), B)
+
+    after = t > time_to_victory
+    late_growth = np.exp(r * np.where(after, t - time_to_victory, 0.0))
+    A = np.where(after, np.where(winner > 0, survivors * late_growth, 0.0), A)
+    B = np.where(after, np.where(winner < 0, survivors * late_growth, 0.0), B)
+    return np.maximum(A, 0.0), np.maximum(B, 0.0)
+
+
+# ------------------ Square Law with Reinforcements (Exact Stepping) ------------------
+def _propagator(alpha, beta, r_blue, r_red, p_blue, p_red, dt):
+    """
+    One-step propagator of the affine system x' = M x + p, M = [[r_blue, -beta], [-alpha, r_red]].
+    Returns the (..., 3, 3) matrix exp(dt * [[M, p], [0, 0]]) computed by scaling and
+    squaring a Taylor series, batched over every parameter combination.
+    """
+    generator = np.zeros(alpha.shape + (3, 3))
+    generator[..., 0, 0], generator[..., 0, 1], generator[..., 0, 2] = r_blue, -beta, p_blue
+    generator[..., 1, 0], generator[..., 1, 1], generator[..., 1, 2] = -alpha, r_red, p_red
+    generator *= dt
+
+    norm = np.abs(generator).sum(axis=-1).max(axis=-1).max(initial=0.0)
+    squarings = max(0, int(np.ceil(np.log2(norm / 0.25))) if norm > 0 else 0)
+    generator /= 2.0 ** squarings
+
+    result = np.broadcast_to(np.eye(3), generator.shape).copy()
+    term = result.copy()
+    for order in range(1, 13):
+        term = term @ generator / order
+        result += term
+    for _ in range(squarings):
+        result = result @ result
+    return result
+
+
+def integrate(A0, B0, alpha, beta, t_end, dt=0.1, r_blue=0.0, r_red=0.0, p_blue=0.0, p_red=0.0, record_every=None):
+    """
+    Solves dA/dt = -beta*B + r_blue*A + p_blue, dB/dt = -alpha*A + r_red*B + p_red
+    for arrays of parameters. p_blue and p_red are constant reinforcement flows
+    (units per unit time, like the engine's per-frame reinforcements).
+
+    The system is linear with constant coefficients, so every combination gets its
+    exact dt-step propagator once and each step is then a handful of multiply-adds.
+    A side that reaches zero is defeated: it is held at zero and receives no further
+    reinforcements, matching BattleEngine. The crossing time is interpolated within
+    the step in which it happens.
+
+    Returns a dict with final "blue", "red", "winner", "time_to_victory" arrays
+    and, if record_every is set, "times" and stacked "blue_history"/"red_history".
+    """
+    arrays = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (A0, B0, alpha, beta, r_blue, r_red, p_blue, p_red)))
+    shape = arrays[0].shape
+    final_A, final_B = arrays[0].ravel().copy(), arrays[1].ravel().copy()
+    step_matrix = _propagator(*(a.ravel() for a in arrays[2:]), dt)
+    coefficients = [np.ascontiguousarray(step_matrix[:, row, col]) for row in (0, 1) for col in (0, 1, 2)]
+
+    # Battles still in progress are kept compacted, so finished ones cost nothing per step
+    live = np.arange(final_A.size)
+    A, B = final_A.copy(), final_B.copy()
+    time_to_victory = np.full(final_A.size, np.inf)
+    over = np.zeros(final_A.size, dtype=bool)
+
+    n_steps = int(np.ceil(t_end / dt))
+    times, blue_history, red_history = [0.0], [final_A.reshape(shape).copy()], [final_B.reshape(shape).copy()]
+    for step in range(1, n_steps + 1):
+        a_a, a_b, a_p, b_a, b_b, b_p = coefficients
+        new_A = a_a * A + a_b * B + a_p
+        new_B = b_a * A + b_b * B + b_p
+
+        ended = (new_A <= 0) | (new_B <= 0)
+        if ended.any():
+            e_A, e_B, n_A, n_B = A[ended], B[ended], new_A[ended], new_B[ended]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                frac_A = np.where(n_A <= 0, e_A / (e_A - n_A), np.inf)
+                frac_B = np.where(n_B <= 0, e_B / (e_B - n_B), np.inf)
+            frac = np.minimum(frac_A, frac_B)
+            # The winner keeps what it had when the loser's last unit fell
+            index = live[ended]
+            time_to_victory[index] = (step - 1 + frac) * dt
+            final_A[index] = np.where(frac_A <= frac_B, 0.0, np.maximum(e_A + frac * (n_A - e_A), 0.0))
+            final_B[index] = np.where(frac_B <= frac_A, 0.0, np.maximum(e_B + frac * (n_B - e_B), 0.0))
+            over[index] = True
+
+            keep = ~ended
+            live, new_A, new_B = live[keep], new_A[keep], new_B[keep]
+            coefficients = [c[keep] for c in coefficients]
+        A, B = new_A, new_B
+
+        if record_every and step % record_every == 0:
+            final_A[live], final_B[live] = A, B
+            times.append(step * dt)
+            blue_history.append(final_A.reshape(shape).copy())
+            red_history.append(final_B.reshape(shape).copy())
+        if len(live) == 0 and not record_every:
+            break
+
+    final_A[live], final_B[live] = A, B
+    winner = np.where(over, np.sign(final_A - final_B), NO_WINNER).astype(np.int8)
+    result = {
+        "blue": final_A.reshape(shape),
+        "red": final_B.reshape(shape),
+        "winner": winner.reshape(shape),
+        "time_to_victory": time_to_victory.reshape(shape),
+    }
+    if record_every:
+        result["times"] = np.array(times)
+        result["blue_history"] = np.stack(blue_history)
+        result["red_history"] = np.stack(red_history)
+    return result
+
+
+# ------------------ Link to the Agent-Based Engine ------------------
+def from_engine_parameters(parameters):
+    """
+    Maps BattleEngine parameters onto the ODE: one frame is one unit of time and the
+    engine's per-frame reinforcements become constant flows p_blue and p_red.
+    Returns keyword arguments for integrate().
+    """
+    from battle_engine import DEFAULT_PARAMETERS
+
+    params = dict(DEFAULT_PARAMETERS, **parameters)
+    rate_blue = params["reinforcement_rate_blue"]
+    rate_red = params["reinforcement_rate_red"]
+    if rate_blue is None:
+        rate_blue = 0.02 * params["num_units_blue"]
+    if rate_red is None:
+        rate_red = 0.03 * params["num_units_red"]
+    return {
+        "A0": params["num_units_blue"],
+        "B0": params["num_units_red"],
+        "alpha": params["alpha"],
+        "beta": params["beta"],
+        "p_blue": np.floor(rate_blue),
+        "p_red": np.floor(rate_red),
+    }
+
+
+def compare_with_engine(parameters=None, n_frames=200, seed=None, dt=0.1):
+    """
+    Runs the agent-based engine and the ODE surrogate side by side for the same
+    parameters and returns both force trajectories, one row per frame.
+    """
+    from battle_engine import BattleEngine
+
+    parameters = dict(parameters or {})
+    engine = BattleEngine(seed=seed, **parameters)
+    reports = engine.run(n_frames)
+    ode = integrate(t_end=n_frames, dt=dt, record_every=int(round(1 / dt)), **from_engine_parameters(parameters))
+    return {
+        "frames": np.arange(1, len(reports) + 1),
+        "engine_blue": np.array([report["blue"] for report in reports]),
+        "engine_red": np.array([report["red"] for report in reports]),
+        "ode_blue": ode["blue_history"][1:len(reports) + 1],
+        "ode_red": ode["red_history"][1:len(reports) + 1],
+        "engine_winner": engine.outcome(),
+        "ode_winner": {BLUE_WINS: "blue", RED_WINS: "red"}.get(int(ode["winner"]), "undecided"),
+        "ode_time_to_victory": float(ode["time_to_victory"]),
+    }
@@ -0,0 +1,225 @@
+import argparse
+
+import numpy as np
+
+from random_streams import RandomStreams
+
+# ------------------ Daily Needs per Soldier (as in the Command Center report) ------------------
+RESOURCES = ("food", "ammo", "fuel")
+FOOD_PER_TROOP = 2.5       # kg
+AMMO_PER_TROOP = (3, 7)    # rounds, drawn per front per day
+FUEL_PER_TROOP = 1.2       # liters
+
+# ------------------ Weather and Supply Risk ------------------
+WEATHER = ("Clear", "Rain", "Fog", "Storm")
+# Day-to-day weather persists; rows are today's weather, columns tomorrow's
+WEATHER_TRANSITIONS = np.array([
+    [0.70, 0.15, 0.10, 0.05],
+    [0.30, 0.45, 0.10, 0.15],
+    [0.40, 0.15, 0.40, 0.05],
+    [0.20, 0.40, 0.05, 0.35],
+])
+WEATHER_CONSUMPTION = np.array([1.0, 1.1, 1.0, 1.3])  # Fuel and food burn faster in bad weather
+WEATHER_LOSSES = np.array([1.0, 0.9, 1.2, 0.7])       # Fog favours ambushes; storms pause the fighting
+
+SUPPLY_RISK = ("Low", "Moderate", "High", "Critical")
+RISK_TRANSITIONS = np.array([
+    [0.85, 0.12, 0.03, 0.00],
+    [0.15, 0.70, 0.12, 0.03],
+    [0.05, 0.20, 0.65, 0.10],
+    [0.02, 0.08, 0.30, 0.60],
+])
+CONVOY_LOSS = np.array([0.0, 0.1, 0.25, 0.5])  # Share of an arriving convoy lost at each risk level
+
+# ------------------ Combat ------------------
+COMBAT_CHANCE = 0.1          # Chance that a front sees heavy fighting on a given day
+LOSS_RANGE = (0.05, 0.25)    # Loss per day of heavy fighting (the old Battlefield Attrition roll)
+SHORTAGE_LOSS = 0.02         # Extra daily loss with no food at all (scaled by the shortfall)
+AMMO_SHORTAGE_PENALTY = 1.0  # Combat losses grow by up to this factor when ammo runs out
+
+
+# ------------------ Resupply Policies ------------------
+# A policy is called once per day as policy(day, state) and returns the supplies to
+# order, shaped (scenarios, fronts, resources). `state` is a dict of the current arrays.
+def no_resupply(day, state):
+    return np.zeros_like(state["stocks"])
+
+
+def order_up_to(days=7):
+    """
+    Keeps `days` of expected consumption on hand or on the way, every day.
+    """
+    def policy(day, state):
+        target = days * state["daily_need"]
+        return np.maximum(target - state["stocks"] - state["in_transit"], 0.0)
+    return policy
+
+
+def emergency_resupply(threshold_days=3, days=7):
+    """
+    The Command Center's resupply_decision as a rule: only when the supply chain
+    is under stress (High or Critical risk) and stocks are running low.
+    """
+    def policy(day, state):
+        stressed = state["risk"] >= SUPPLY_RISK.index("High")
+        low = state["stocks"] + state["in_transit"] < threshold_days * state["daily_need"]
+        order = np.maximum(days * state["daily_need"] - state["stocks"] - state["in_transit"], 0.0)
+        return np.where(stressed[..., None] & low, order, 0.0)
+    return policy
+
+
+POLICIES = {
+    "none": no_resupply,
+    "order_up_to": order_up_to(),
+    "emergency": emergency_resupply(),
+}
+
+
+# ------------------ Vectorized Campaign Engine ------------------
+def _markov_step(rng, current, transitions):
+    """
+    Advances an array of Markov chain states by one day with a single uniform draw each.
+    """
+    cumulative = np.cumsum(transitions, axis=1)
+    draws = rng.random(current.shape)
+    return (draws[..., None] > cumulative[current]).sum(axis=-1).clip(0, len(transitions) - 1)
+
+
+def simulate_campaign(troops, n_scenarios=1000, n_days=180, policy="order_up_to", lead_time=3,
+                      initial_days_of_supply=7, seed=None, record=True):
+    """
+    Steps casualties, consumption, weather, supply risk and resupply together for
+    n_scenarios independent campaigns at once. `troops` is the starting force per
+    front (a list or an {front: troops} dict). Orders arrive after `lead_time` days;
+    a convoy due on a stormy day waits for the next day without a storm, and part
+    of it is lost according to the supply risk on the day it arrives.
+    With record=True the result holds (scenarios, fronts, days) float32 histories.
+    """
+    fronts = list(troops) if isinstance(troops, dict) else [f"Front {i + 1}" for i in range(len(troops))]
+    start = np.array(list(troops.values()) if isinstance(troops, dict) else troops, dtype=np.float64)
+    policy = POLICIES[policy] if isinstance(policy, str) else policy
+    streams = RandomStreams(seed)
+    shape = (n_scenarios, len(fronts))
+
+    force = np.broadcast_to(start, shape).copy()
+    rate = np.array([FOOD_PER_TROOP, np.mean(AMMO_PER_TROOP), FUEL_PER_TROOP])
+    stocks = force[..., None] * rate * initial_days_of_supply
+    pipeline = np.zeros((lead_time + 1,) + shape + (len(RESOURCES),))
+    weather = np.zeros(shape, dtype=np.int64)
+    risk = np.zeros(shape, dtype=np.int64)
+
+    history = {}
+    if record:
+        for name in ("troops", "losses", "shortfall", "delivered") + RESOURCES:
+            history[name] = np.zeros(shape + (n_days,), dtype=np.float32)
+        history["weather"] = np.zeros(shape + (n_days,), dtype=np.int8)
+        history["risk"] = np.zeros(shape + (n_days,), dtype=np.int8)
+    total_losses = np.zeros(shape)
+    shortage_days = np.zeros(shape, dtype=np.int64)
+
+    for day in range(n_days):
+        weather = _markov_step(streams.weather, weather, WEATHER_TRANSITIONS)
+        risk = _markov_step(streams.supply_risk, risk, RISK_TRANSITIONS)
+
+        # Convoys: today's slot arrives unless it storms, in which case it rolls over to tomorrow
+        slot = day % len(pipeline)
+        arriving = pipeline[slot].copy()
+        pipeline[slot] = 0.0
+        storm = weather == WEATHER.index("Storm")
+        pipeline[(day + 1) % len(pipeline)] += np.where(storm[..., None], arriving, 0.0)
+        delivered = np.where(storm[..., None], 0.0, arriving) * (1.0 - CONVOY_LOSS[risk])[..., None]
+        stocks += delivered
+
+        # Consumption
+        ammo_rate = streams.supply_risk.integers(AMMO_PER_TROOP[0], AMMO_PER_TROOP[1] + 1, size=shape)
+        need = force[..., None] * np.stack([
+            np.full(shape, FOOD_PER_TROOP) * WEATHER_CONSUMPTION[weather],
+            ammo_rate.astype(np.float64),
+            np.full(shape, FUEL_PER_TROOP) * WEATHER_CONSUMPTION[weather],
+        ], axis=-1)
+        used = np.minimum(stocks, need)
+        stocks -= used
+        shortfall = np.divide(need - used, need, out=np.zeros_like(need), where=need > 0)
+
+        # Losses: heavy fighting on some days, worse without ammo, plus hunger
+        rng = streams.casualties
+        fighting = rng.random(shape) < COMBAT_CHANCE
+        intensity = rng.uniform(LOSS_RANGE[0], LOSS_RANGE[1], size=shape) * WEATHER_LOSSES[weather]
+        combat = np.where(fighting, intensity * (1.0 + AMMO_SHORTAGE_PENALTY * shortfall[..., 1]), 0.0)
+        loss_rate = np.minimum(combat + SHORTAGE_LOSS * shortfall[..., 0], 1.0)
+        losses = force * loss_rate
+        force -= losses
+        total_losses += losses
+        shortage_days += shortfall.max(axis=-1) > 0
+
+        # Orders placed today arrive after the lead time
+        state = {"troops": force, "stocks": stocks, "in_transit": pipeline.sum(axis=0), "weather": weather,
+                 "risk": risk, "daily_need": force[..., None] * rate}
+        pipeline[(day + lead_time) % len(pipeline)] += np.maximum(policy(day, state), 0.0)
+
+        if record:
+            history["troops"][..., day] = force
+            history["losses"][..., day] = losses
+            history["shortfall"][..., day] = shortfall.max(axis=-1)
+            history["delivered"][..., day] = delivered.sum(axis=-1)
+            for i, name in enumerate(RESOURCES):
+                history[name][..., day] = stocks[..., i]
+            history["weather"][..., day] = weather
+            history["risk"][..., day] = risk
+
+    return {
+        "fronts": fronts,
+        "start": start,
+        "troops": force,
+        "losses": total_losses,
+        "shortage_days": shortage_days,
+        "stocks": stocks,
+        "history": history,
+    }
+
+
+def summarize_campaign(result):
+    """
+    Per-front survival and shortage statistics across all scenarios.
+    """
+    survival = result["troops"] / np.maximum(result["start"], 1e-9)
+    return {
+        front: {
+            "mean_survival": float(survival[:, i].mean()),
+            "survival_5th_percentile": float(np.percentile(survival[:, i], 5)),
+            "collapse_probability": float(np.mean(survival[:, i] < 0.25)),
+            "mean_shortage_days": float(result["shortage_days"][:, i].mean()),
+        }
+        for i, front in enumerate(result["fronts"])
+    }
+
+
+def format_summary(summary, days):
+    lines = [f"📦 Campaign Logistics Forecast ({days} days):"]
+    for front, stats in summary.items():
+        lines.append(f"- {front}: {stats['mean_survival']:.0%} of troops remain "
+                     f"(worst 5%: {stats['survival_5th_percentile']:.0%}), "
+                     f"collapse risk {stats['collapse_probability']:.0%}, "
+                     f"{stats['mean_shortage_days']:.1f} days short of supplies")
+    return "\n".join(lines)
+
+
+# ------------------ Command Line ------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vectorized multi-day campaign attrition and logistics.")
+    parser.add_argument("troops", type=float, nargs="*", default=[1000, 1000, 1000], help="starting troops per front")
+    parser.add_argument("--scenarios", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="order_up_to")
+    parser.add_argument("--lead-time", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    result = simulate_campaign(args.troops, args.scenarios, args.days, args.policy, args.lead_time, seed=args.seed,
+                               record=False)
+    print(format_summary(summarize_campaign(result), args.days))
+    return result
+
+
+if __name__ == "__main__":
+    main()
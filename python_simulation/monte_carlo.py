@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from battle_engine import BattleEngine, parse_parameters
+
+OUTCOMES = ("blue", "red", "stalemate")
+
+
+# ------------------ Single Battle ------------------
+def run_battle(parameters, seed, n_frames=200):
+    """
+    Runs one headless battle and returns its outcome as a plain dict.
+    """
+    engine = BattleEngine(seed=seed, **parameters)
+    engine.run(n_frames)
+    return {
+        "winner": engine.outcome(),
+        "decisive": engine.finished,
+        "frames": engine.frame,
+        "blue": len(engine.blue),
+        "red": len(engine.red),
+    }
+
+
+def _run_chunk(parameters, seeds, n_frames):
+    """
+    Worker task: runs a block of battles and packs the results into small arrays
+    so that only a few bytes per battle travel back to the parent process.
+    """
+    winner = np.empty(len(seeds), dtype=np.int8)
+    decisive = np.empty(len(seeds), dtype=bool)
+    frames = np.empty(len(seeds), dtype=np.int32)
+    blue = np.empty(len(seeds), dtype=np.int64)
+    red = np.empty(len(seeds), dtype=np.int64)
+    for i, seed in enumerate(seeds):
+        result = run_battle(parameters, seed, n_frames)
+        winner[i] = OUTCOMES.index(result["winner"])
+        decisive[i] = result["decisive"]
+        frames[i] = result["frames"]
+        blue[i] = result["blue"]
+        red[i] = result["red"]
+    return winner, decisive, frames, blue, red
+
+
+# ------------------ Batch of Independent Battles ------------------
+def run_batch(n_runs, parameters=None, n_frames=200, seed=None, workers=None, chunks_per_worker=4):
+    """
+    Runs n_runs independently seeded battles across a process pool and returns
+    the raw per-run arrays. Every battle gets its own child SeedSequence, so the
+    results are identical regardless of how many workers are used. The root
+    entropy is returned too, so a batch run without a seed can still be replayed.
+    """
+    if n_runs < 1:
+        raise ValueError(f"n_runs must be at least 1, got {n_runs}")
+    parameters = dict(parameters or {})
+    workers = workers or os.cpu_count() or 1
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    seeds = root.spawn(n_runs)
+
+    # A few chunks per worker keeps every core busy without paying pickling costs per battle
+    n_chunks = max(1, min(n_runs, workers * chunks_per_worker))
+    blocks = [list(block) for block in np.array_split(np.array(seeds, dtype=object), n_chunks) if len(block)]
+
+    if workers == 1:
+        parts = [_run_chunk(parameters, block, n_frames) for block in blocks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_chunk, [parameters] * len(blocks), blocks, [n_frames] * len(blocks)))
+
+    winner, decisive, frames, blue, red = (np.concatenate(column) for column in zip(*parts))
+    return {"winner": winner, "decisive": decisive, "frames": frames, "blue": blue, "red": red,
+            "entropy": root.entropy, "spawn_key": tuple(root.spawn_key)}
+
+
+def replay_seed(entropy, index, spawn_key=()):
+    """
+    The exact seed battle `index` of a batch received, so an outlier can be rerun
+    (e.g. with a viewer or recorder attached) from the batch's recorded entropy
+    (and spawn_key, when the batch itself was seeded with a child SeedSequence).
+    """
+    return np.random.SeedSequence(entropy, spawn_key=tuple(spawn_key) + (index,))
+
+
+# ------------------ Outcome Statistics ------------------
+def wilson_interval(successes, n, confidence=0.95):
+    """
+    Wilson score interval for a binomial proportion.
+    """
+    if n == 0:
+        return (float("nan"), float("nan"))
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / n
+    centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return (float(centre - half), float(centre + half))
+
+
+def mean_interval(values, confidence=0.95):
+    """
+    Mean of a sample with a normal-approximation confidence interval.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return float("nan"), (float("nan"), float("nan"))
+    mean = float(values.mean())
+    if len(values) == 1:
+        return mean, (mean, mean)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half = z * values.std(ddof=1) / np.sqrt(len(values))
+    return mean, (float(mean - half), float(mean + half))
+
+
+def summarize(results, confidence=0.95):
+    """
+    Turns the per-run arrays from run_batch into win probabilities, the
+    time-to-victory distribution and final force ratios with confidence intervals.
+    """
+    n = len(results["winner"])
+    summary = {"runs": n, "confidence": confidence, "win_probability": {}}
+    for code, side in enumerate(OUTCOMES):
+        wins = int(np.count_nonzero(results["winner"] == code))
+        summary["win_probability"][side] = {
+            "estimate": wins / n if n else float("nan"),
+            "interval": wilson_interval(wins, n, confidence),
+        }
+
+    decisive_frames = results["frames"][results["decisive"]]
+    mean, interval = mean_interval(decisive_frames, confidence)
+    summary["time_to_victory"] = {
+        "decisive_runs": int(len(decisive_frames)),
+        "mean": mean,
+        "interval": interval,
+        "percentiles": {str(q): float(np.percentile(decisive_frames, q)) if len(decisive_frames) else float("nan")
+                        for q in (5, 25, 50, 75, 95)},
+    }
+
+    blue, red = results["blue"].astype(np.float64), results["red"].astype(np.float64)
+    total = blue + red
+    share = np.divide(blue, total, out=np.full(n, 0.5), where=total > 0)
+    summary["final_forces"] = {}
+    for name, values in (("blue", blue), ("red", red), ("blue_share", share)):
+        mean, interval = mean_interval(values, confidence)
+        summary["final_forces"][name] = {"mean": mean, "interval": interval}
+    return summary
+
+
+def print_summary(summary, emit=print):
+    emit("\n--------------------------------------------------")
+    emit(f"🎲 **Monte Carlo Report ({summary['runs']} battles)** 🎲")
+    level = int(round(summary["confidence"] * 100))
+    labels = {"blue": "🔵 U.S. victory", "red": "🔴 PAVN victory", "stalemate": "🔄 Stalemate"}
+    for side, stats in summary["win_probability"].items():
+        low, high = stats["interval"]
+        emit(f"{labels[side]}: {stats['estimate']:.3f} ({level}% CI {low:.3f}-{high:.3f})")
+
+    ttv = summary["time_to_victory"]
+    if ttv["decisive_runs"]:
+        low, high = ttv["interval"]
+        emit(f"⏱️ Time to victory: mean {ttv['mean']:.1f} frames ({level}% CI {low:.1f}-{high:.1f}), "
+              f"median {ttv['percentiles']['50']:.0f} over {ttv['decisive_runs']} decisive battles")
+    else:
+        emit("⏱️ No battle ended decisively within the frame limit.")
+
+    share = summary["final_forces"]["blue_share"]
+    low, high = share["interval"]
+    emit(f"⚖️ Final U.S. share of surviving forces: {share['mean']:.3f} ({level}% CI {low:.3f}-{high:.3f})")
+
+
+# ------------------ Command Line ------------------
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run many independently seeded Ia Drang battles in parallel.")
+    parser.add_argument("--runs", type=int, default=1000, help="number of battles to simulate")
+    parser.add_argument("--frames", type=int, default=200, help="frame limit per battle")
+    parser.add_argument("--seed", type=int, default=None, help="root seed for the whole batch")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--confidence", type=float, default=0.95, help="confidence level for intervals")
+    parser.add_argument("--set", dest="overrides", action="append", default=[],
+                        metavar="NAME=VALUE", help="override a simulation parameter (repeatable)")
+    parser.add_argument("--json", dest="json_path", default=None, help="also write the summary to this JSON file")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        parameters = parse_parameters(args.overrides)
+    except ValueError as error:
+        parser.error(str(error))
+
+    start = time.perf_counter()
+    results = run_batch(args.runs, parameters, args.frames, args.seed, args.workers)
+    summary = summarize(results, args.confidence)
+    summary["parameters"] = parameters
+    summary["seed"] = args.seed
+    summary["entropy"] = results["entropy"]
+    summary["elapsed_seconds"] = time.perf_counter() - start
+
+    print_summary(summary)
+    print(f"Finished in {summary['elapsed_seconds']:.1f} s")
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(summary, file, indent=4)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import json
+import time
+from contextlib import nullcontext
+
+PHASES = ("move", "engage", "reinforce", "render", "io")
+
+
+# ------------------ Phase Timers and Counters ------------------
+class Profiler:
+    """
+    Accumulates wall-clock time per phase (move, engage, reinforce, render, io)
+    and named counters for one run.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self.counters = {}
+        self.started = time.perf_counter()
+
+    def phase(self, name):
+        return _PhaseTimer(self, name)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self):
+        wall = time.perf_counter() - self.started
+        return {
+            "wall_seconds": wall,
+            "phases": {name: {"seconds": self.seconds[name], "calls": self.calls[name],
+                              "share": self.seconds[name] / wall if wall > 0 else 0.0}
+                       for name in self.seconds},
+            "counters": dict(self.counters),
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=4)
+
+
+class _PhaseTimer:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        profiler = self.profiler
+        profiler.seconds[self.name] = profiler.seconds.get(self.name, 0.0) + elapsed
+        profiler.calls[self.name] = profiler.calls.get(self.name, 0) + 1
+
+
+class NullProfiler:
+    """
+    Default profiler: every hook is a shared no-op, so unprofiled runs pay
+    one attribute lookup and an empty with-block per phase.
+    """
+    enabled = False
+    _context = nullcontext()
+
+    def phase(self, name):
+        return self._context
+
+    def count(self, name, amount=1):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,60 @@
+import numpy as np
+
+# One independent Generator per subsystem, derived from a single root seed in this order
+STREAMS = ("movement", "casualties", "reinforcements", "weather", "supply_risk")
+
+
+# ------------------ Per-Subsystem Random Streams ------------------
+class RandomStreams:
+    """
+    Independent numpy Generators for each subsystem, all spawned from one root
+    SeedSequence. Drawing more weather rolls never shifts the casualty stream, and
+    a run is replayed exactly from `entropy` and `spawn_key` (or from state()).
+    `seed` may be an int, a SeedSequence (e.g. a Monte Carlo child) or None for
+    fresh entropy, which is then recorded so the run can still be replayed.
+    """
+
+    def __init__(self, seed=None):
+        root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.root = root
+        self.entropy = root.entropy
+        self.spawn_key = tuple(root.spawn_key)
+        self.generators = {name: np.random.Generator(np.random.PCG64(child))
+                           for name, child in zip(STREAMS, root.spawn(len(STREAMS)))}
+
+    def __getitem__(self, name):
+        return self.generators[name]
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["generators"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def spawn(self):
+        """
+        A fresh child SeedSequence for a sub-run (e.g. one battle of a campaign).
+        Children are numbered in order, so the same sequence of calls replays exactly.
+        """
+        return self.root.spawn(1)[0]
+
+    def state(self):
+        """
+        Everything needed to continue bit-for-bit, as plain JSON-serializable values:
+        the root seed, how many children it has spawned and each stream's bit-generator state.
+        """
+        return {
+            "entropy": self.entropy,
+            "spawn_key": list(self.spawn_key),
+            "children_spawned": self.root.n_children_spawned,
+            "streams": {name: generator.bit_generator.state for name, generator in self.generators.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        streams = cls(np.random.SeedSequence(state["entropy"], spawn_key=state["spawn_key"]))
+        streams.root = np.random.SeedSequence(state["entropy"], spawn_key=state["spawn_key"],
+                                              n_children_spawned=state["children_spawned"])
+        for name, generator in streams.generators.items():
+            generator.bit_generator.state = state["streams"][name]
+        return streams
@@ -0,0 +1,216 @@
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from battle_engine import parse_parameters
+from battle_recorder import BattleRecording, record_battle
+
+VIDEO_FORMATS = (".mp4", ".gif")
+
+
+# ------------------ Worker Process (Agg, no display) ------------------
+_worker = None
+
+
+def _init_worker(directory, width, height, dpi):
+    """
+    Builds the 3D figure once per worker process on the Agg backend and opens the
+    recording as a memory map, so tasks only carry frame numbers.
+    """
+    global _worker
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D
+
+    from battle_engine import DEFAULT_PARAMETERS
+
+    recording = BattleRecording(directory)
+    params = dict(DEFAULT_PARAMETERS, **(recording.meta.get("parameters") or {}))
+
+    fig = plt.figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    ax = fig.add_subplot(111, projection='3d')
+    ax.set_xlim(0, params["battlefield_size"])
+    ax.set_ylim(0, params["battlefield_size"])
+    ax.set_zlim(0, params["terrain_variation"])
+    ax.set_xlabel("X Position (km)")
+    ax.set_ylabel("Y Position (km)")
+    ax.set_zlabel("Elevation (km)")
+    blue = ax.scatter([], [], [], color='blue', label='U.S. Army (Blue)')
+    red = ax.scatter([], [], [], color='red', label='PAVN Forces (Red)')
+    ax.legend()
+    _worker = {"recording": recording, "fig": fig, "ax": ax, "blue": blue, "red": red}
+
+
+def _draw(frame):
+    worker = _worker
+    rows = worker["recording"].positions_at(frame)
+    for code, scatter in enumerate((worker["blue"], worker["red"])):
+        side = rows[rows["side"] == code]
+        scatter._offsets3d = (side["x"], side["y"], side["elevation"])
+    worker["ax"].set_title(f"Battle of Ia Drang Valley - Frame {frame}")
+    worker["fig"].canvas.draw()
+
+
+def _render_rgb(frames):
+    """
+    Task: renders a block of frames and returns them as one (n, height, width, 3) uint8 array.
+    """
+    images = []
+    for frame in frames:
+        _draw(frame)
+        images.append(np.asarray(_worker["fig"].canvas.buffer_rgba())[..., :3].copy())
+    return np.stack(images)
+
+
+def _render_png(frames, directory):
+    """
+    Task: renders a block of frames straight to numbered PNG files (encoded in the worker).
+    """
+    for frame in frames:
+        _draw(frame)
+        _worker["fig"].savefig(os.path.join(directory, f"frame_{frame:05d}.png"))
+    return len(frames)
+
+
+# ------------------ Encoders (run in the parent, in frame order) ------------------
+def _encode_mp4(path, blocks, fps):
+    ffmpeg = _require_ffmpeg()
+    process = None
+    for block in blocks:
+        if process is None:
+            height, width = block.shape[1:3]
+            process = subprocess.Popen([ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                                        "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+                                        "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", path],
+                                       stdin=subprocess.PIPE)
+        process.stdin.write(block.tobytes())
+    if process is not None:
+        process.stdin.close()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed with exit code {process.returncode}")
+
+
+def _require_ffmpeg():
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("MP4 output needs ffmpeg on the PATH; use a .gif or a PNG directory instead")
+    return ffmpeg
+
+
+def _encode_gif(path, blocks, fps):
+    from PIL import Image
+
+    images = (Image.fromarray(image) for block in blocks for image in block)
+    first = next(images, None)
+    if first is not None:
+        first.save(path, save_all=True, append_images=images, duration=int(round(1000 / fps)), loop=0)
+
+
+# ------------------ Render Pipeline ------------------
+def _bounded_map(pool, fn, blocks, window):
+    """
+    Like pool.map, yielding results in submission order, but keeps at most `window`
+    blocks in flight so finished frames cannot pile up while the encoder falls behind.
+    """
+    pending = deque()
+    for block in blocks:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(fn, block))
+    while pending:
+        yield pending.popleft().result()
+
+
+def render_recording(directory, output, fps=30, workers=None, frames_per_task=8, every=1, start=0, stop=None,
+                     width=800, height=600, dpi=100, emit=print):
+    """
+    Renders a recorded battle (made with record_positions=True) on a pool of Agg
+    worker processes. `output` ending in .mp4 or .gif is encoded in frame order as
+    blocks come back; anything else is a directory of frame_NNNNN.png files, which
+    the workers write themselves. Returns frames rendered and frames per second.
+    """
+    recording = BattleRecording(directory)
+    if "positions" not in recording.tables:
+        raise ValueError(f"{directory} was recorded without unit positions (record_positions=True)")
+    extension = os.path.splitext(output)[1].lower()
+    if extension == ".mp4":
+        _require_ffmpeg()  # Before any rendering starts
+
+    frames = recording.frames["frame"][start:stop:every].tolist()
+    blocks = [frames[i:i + frames_per_task] for i in range(0, len(frames), frames_per_task)]
+    workers = workers or os.cpu_count() or 1
+
+    began = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(directory, width, height, dpi)) as pool:
+        if extension in VIDEO_FORMATS:
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+            # Results come back in submission order, so blocks arrive in frame order
+            rendered = _bounded_map(pool, _render_rgb, blocks, 2 * workers)
+            (_encode_mp4 if extension == ".mp4" else _encode_gif)(output, rendered, fps)
+        else:
+            os.makedirs(output, exist_ok=True)
+            list(pool.map(_render_png, blocks, [output] * len(blocks)))
+    elapsed = time.perf_counter() - began
+
+    rate = len(frames) / elapsed if elapsed > 0 else float("inf")
+    emit(f"🎬 Rendered {len(frames)} frames to {output} in {elapsed:.1f} s ({rate:.1f} frames/s, {workers} workers)")
+    return {"frames": len(frames), "seconds": elapsed, "frames_per_second": rate, "output": output}
+
+
+def render_battle(output, n_frames=200, seed=None, recording_dir=None, parameters=None, **options):
+    """
+    Runs a seeded battle headlessly, records every unit's position (to `recording_dir`,
+    or a temporary directory) and renders it with render_recording().
+    """
+    if os.path.splitext(output)[1].lower() == ".mp4":
+        _require_ffmpeg()  # Before the battle is recorded
+    temporary = None
+    if recording_dir is None:
+        temporary = tempfile.TemporaryDirectory(prefix="battle_render_")
+        recording_dir = temporary.name
+    try:
+        record_battle(recording_dir, n_frames, seed, formats=(), record_positions=True, **(parameters or {}))
+        return render_recording(recording_dir, output, **options)
+    finally:
+        if temporary is not None:
+            temporary.cleanup()
+
+
+# ------------------ Command Line ------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a battle offline to MP4, GIF or PNG frames (no display needed).")
+    parser.add_argument("output", help="file.mp4, file.gif, or a directory for PNG frames")
+    parser.add_argument("--recording", default=None, metavar="DIR", help="render this recording instead of a new run")
+    parser.add_argument("--frames", type=int, default=200, help="frames to simulate for a new run")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--set", dest="overrides", action="append", default=[],
+                        metavar="NAME=VALUE", help="override a simulation parameter (repeatable)")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: all cores)")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--every", type=int, default=1, help="render every Nth recorded frame")
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=600)
+    args = parser.parse_args(argv)
+    try:
+        parameters = parse_parameters(args.overrides)
+    except ValueError as error:
+        parser.error(str(error))
+
+    options = {"fps": args.fps, "workers": args.workers, "every": args.every, "width": args.width,
+               "height": args.height}
+    if args.recording:
+        return render_recording(args.recording, args.output, **options)
+    return render_battle(args.output, args.frames, args.seed, parameters=parameters, **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+import multiprocessing
+import queue
+import time
+import traceback
+
+# Seconds between progress messages, so a fast simulation cannot flood the queue
+PROGRESS_INTERVAL = 0.1
+
+
+# ------------------ Worker-Side Controls ------------------
+class WorkerControl:
+    """
+    What a job sees inside the worker process: report() sends a progress message
+    to the GUI, `cancelled` and `paused` reflect the GUI's buttons, and
+    wait_if_paused() blocks while paused (returning early on cancel).
+    """
+
+    def __init__(self, progress, cancel_event, resume_event):
+        self.progress = progress
+        self.cancel_event = cancel_event
+        self.resume_event = resume_event
+        self.paused_seconds = 0.0
+        self._last_report = 0.0
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    @property
+    def paused(self):
+        return not self.resume_event.is_set()
+
+    def wait_if_paused(self):
+        start = time.perf_counter()
+        while self.paused and not self.cancelled:
+            self.resume_event.wait(0.1)
+        self.paused_seconds += time.perf_counter() - start
+
+    def report(self, force=False, **fields):
+        """
+        Sends a progress message, at most once per PROGRESS_INTERVAL unless forced.
+        """
+        now = time.perf_counter()
+        if force or now - self._last_report >= PROGRESS_INTERVAL:
+            self._last_report = now
+            self.progress.put(fields)
+
+    def log(self, line):
+        self.progress.put({"log": line})
+
+
+class _Progress:
+    """
+    Frame, force counts and ETA for a run of `total` steps, not counting time spent paused.
+    """
+
+    def __init__(self, control, total):
+        self.control = control
+        self.total = total
+        self.start = time.perf_counter()
+
+    def update(self, done, force=False, **fields):
+        elapsed = time.perf_counter() - self.start - self.control.paused_seconds
+        eta = elapsed / done * (self.total - done) if done else None
+        self.control.report(force=force, done_steps=done, total=self.total, elapsed=elapsed, eta=eta, **fields)
+
+
+# ------------------ Jobs (run inside the worker process) ------------------
+def battle_job(control, n_frames=200, seed=None, parameters=None):
+    """
+    Headless battle that streams frame, force counts and narration back to the GUI.
+    """
+    from battle_engine import BattleEngine
+    from battle_view import final_report, narrate
+
+    engine = BattleEngine(seed=seed, **(parameters or {}))
+    progress = _Progress(control, n_frames)
+    while engine.frame < n_frames and not engine.finished and not control.cancelled:
+        control.wait_if_paused()
+        report = engine.step()
+        narrate(report, emit=control.log)
+        progress.update(engine.frame, frame=engine.frame, blue=report["blue"], red=report["red"])
+    progress.update(engine.frame, force=True, frame=engine.frame, blue=len(engine.blue), red=len(engine.red))
+
+    lines = []
+    final_report(engine, emit=lines.append)
+    return {"outcome": engine.outcome(), "frames": engine.frame, "report": "\n".join(lines)}
+
+
+def watch_battle_job(control, n_frames=200, seed=None, parameters=None, target_fps=30, sim_rate=None):
+    """
+    The blitted matplotlib battle view, opened by the worker so plt.show() blocks
+    the worker instead of the Tk window. Pause freezes the physics clock; cancel
+    closes the figure.
+    """
+    import matplotlib.pyplot as plt
+
+    from battle_engine import BattleEngine
+    from battle_view import WATCH_SIM_RATE, BattleViewer, final_report, narrate
+
+    engine = BattleEngine(seed=seed, **(parameters or {}))
+    progress = _Progress(control, n_frames)
+
+    def on_report(report):
+        narrate(report, emit=control.log)
+        progress.update(engine.frame, frame=engine.frame, blue=report["blue"], red=report["red"])
+
+    viewer = BattleViewer(engine, n_frames=n_frames, target_fps=target_fps, sim_rate=sim_rate or WATCH_SIM_RATE,
+                          on_report=on_report)
+    viewer.build()
+
+    def check_controls():
+        viewer.clock.paused = control.paused
+        if control.cancelled:
+            plt.close(viewer.fig)
+
+    timer = viewer.fig.canvas.new_timer(interval=100)
+    timer.add_callback(check_controls)
+    timer.start()
+    viewer.show()
+
+    progress.update(engine.frame, force=True, frame=engine.frame, blue=len(engine.blue), red=len(engine.red))
+    lines = []
+    final_report(engine, emit=lines.append)
+    return {"outcome": engine.outcome(), "frames": engine.frame, "report": "\n".join(lines)}
+
+
+def batch_job(control, n_runs=200, n_frames=200, seed=None, parameters=None):
+    """
+    A Monte Carlo batch run battle by battle so it can report progress and stop
+    early; a cancelled batch is summarized over the battles that finished.
+    """
+    import numpy as np
+
+    from monte_carlo import OUTCOMES, print_summary, run_battle, summarize
+
+    columns = {name: [] for name in ("winner", "decisive", "frames", "blue", "red")}
+    progress = _Progress(control, n_runs)
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    for i, child in enumerate(root.spawn(n_runs)):
+        control.wait_if_paused()
+        if control.cancelled:
+            break
+        result = run_battle(parameters or {}, child, n_frames)
+        result["winner"] = OUTCOMES.index(result["winner"])
+        for name, column in columns.items():
+            column.append(result[name])
+        progress.update(i + 1, runs=i + 1)
+
+    if not columns["winner"]:
+        return {"runs": 0, "report": "No battles finished."}
+    summary = summarize({name: np.array(column) for name, column in columns.items()})
+    lines = []
+    print_summary(summary, emit=lines.append)
+    return {"runs": summary["runs"], "report": "\n".join(lines)}
+
+
+def campaign_job(control, allocations, seed=None):
+    """
+    One campaign turn (a battle per front on its own process pool).
+    """
+    from campaign import format_results, run_campaign_turn
+
+    control.report(force=True, status="Fighting on every front...")
+    results = run_campaign_turn(allocations, seed=seed)
+    return {"results": results, "report": format_results(results)}
+
+
+def pygame_job(control, num_units=100, seed=None):
+    from DiegoPython import run_pygame_battle
+
+    return run_pygame_battle(num_units, seed, control)
+
+
+JOBS = {
+    "battle": battle_job,
+    "watch": watch_battle_job,
+    "batch": batch_job,
+    "campaign": campaign_job,
+    "pygame": pygame_job,
+}
+
+
+def _run_job(job, kwargs, progress, cancel_event, resume_event):
+    control = WorkerControl(progress, cancel_event, resume_event)
+    try:
+        result = JOBS[job](control, **kwargs)
+        progress.put({"finished": True, "cancelled": control.cancelled, "result": result})
+    except BaseException:
+        progress.put({"finished": True, "cancelled": control.cancelled, "error": traceback.format_exc()})
+
+
+# ------------------ GUI-Side Handle ------------------
+class SimulationWorker:
+    """
+    Runs one job in a separate process so the Tk event loop never waits on it.
+    The GUI calls poll() from an after() callback to drain progress messages
+    without blocking, and pause(), resume() and cancel() from its buttons.
+    A message with "finished" is always the last one a job sends.
+    """
+
+    def __init__(self, job, **kwargs):
+        if job not in JOBS:
+            raise ValueError(f"Unknown job {job!r}; expected one of: {', '.join(JOBS)}")
+        # A fresh interpreter per job: forking a process that has Tk open is not safe
+        context = multiprocessing.get_context("spawn")
+        self.progress = context.Queue()
+        self.cancel_event = context.Event()
+        self.resume_event = context.Event()
+        self.resume_event.set()
+        self.process = context.Process(target=_run_job, args=(job, kwargs, self.progress, self.cancel_event,
+                                                              self.resume_event))
+        self.finished = False
+
+    def start(self):
+        self.process.start()
+        return self
+
+    def pause(self):
+        self.resume_event.clear()
+
+    def resume(self):
+        self.resume_event.set()
+
+    @property
+    def paused(self):
+        return not self.resume_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.resume_event.set()
+
+    def poll(self, limit=100):
+        """
+        Returns the progress messages waiting right now (at most `limit`).
+        If the process died without saying so, a final error message is made up.
+        """
+        messages = []
+        while len(messages) < limit:
+            try:
+                message = self.progress.get_nowait()
+            except queue.Empty:
+                break
+            messages.append(message)
+            if message.get("finished"):
+                self.finished = True
+                self.process.join(timeout=1.0)
+                break
+        if not messages and not self.finished and self.process.exitcode is not None:
+            # Give the last message a moment to come through the pipe before assuming a crash
+            try:
+                messages.append(self.progress.get(timeout=0.5))
+            except queue.Empty:
+                messages.append({"finished": True, "cancelled": self.cancel_event.is_set(),
+                                 "error": f"Simulation process exited with code {self.process.exitcode}"})
+            self.finished = bool(messages[-1].get("finished"))
+        return messages
+
+    def stop(self, timeout=2.0):
+        """
+        Cancels the job and makes sure the process is gone (used when a window closes).
+        """
+        self.cancel()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
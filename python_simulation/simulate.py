@@ -0,0 +1,92 @@
+import argparse
+import sys
+
+# Only the standard library is imported up front; the engine (and NumPy) load
+# once the arguments are parsed, and no GUI toolkit is ever imported here.
+# Cold start to a first frame is bounded below by importing NumPy itself (about
+# three quarters of it on a slow single core), so it can exceed 200 ms there.
+
+
+# ------------------ Command Line ------------------
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run Ia Drang battles headlessly (no tkinter, matplotlib or pygame).")
+    parser.add_argument("--frames", type=int, default=200, help="frame limit per battle")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--set", dest="overrides", action="append", default=[],
+                        metavar="NAME=VALUE", help="override a simulation parameter (repeatable)")
+    parser.add_argument("--runs", type=int, default=1, help="battles to run; more than one hands off to monte_carlo")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes when --runs > 1")
+    parser.add_argument("--record", default=None, metavar="DIR", help="stream the battle to DIR (see battle_recorder)")
+    parser.add_argument("--profile", default=None, metavar="PATH", help="write a per-phase JSON profile of the run")
+    parser.add_argument("--checkpoint", default=None, metavar="PATH", help="save a resumable .npz checkpoint here")
+    parser.add_argument("--checkpoint-every", type=int, default=1000, metavar="N",
+                        help="frames between checkpoints (one is always written at the end)")
+    parser.add_argument("--resume", default=None, metavar="PATH", help="continue a battle from a checkpoint")
+    parser.add_argument("--quiet", action="store_true", help="only print the final result")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # Overrides are checked after parsing, so argparse never has to import the engine
+    from battle_engine import parse_parameters
+
+    try:
+        parameters = parse_parameters(args.overrides)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.runs > 1:
+        from monte_carlo import print_summary, run_batch, summarize
+
+        results = run_batch(args.runs, parameters, args.frames, args.seed, args.workers)
+        print_summary(summarize(results))
+        return 0
+
+    from battle_engine import BattleEngine
+    from battle_view import final_report, narrate
+    from profiling import Profiler
+
+    profiler = Profiler() if args.profile else None
+    if args.resume:
+        engine = BattleEngine.load_checkpoint(args.resume, profiler)
+    else:
+        engine = BattleEngine(seed=args.seed, profiler=profiler, **parameters)
+    if args.seed is None and not args.resume and not args.quiet:
+        print(f"Seed entropy: {engine.streams.entropy} (pass it to --seed to replay this battle)")
+
+    callbacks = [] if args.quiet else [narrate]
+    if args.checkpoint:
+        def checkpoint(report):
+            if engine.frame % args.checkpoint_every == 0:
+                engine.save_checkpoint(args.checkpoint)
+        callbacks.append(checkpoint)
+    recorder = None
+    if args.record:
+        from battle_recorder import BattleRecorder
+
+        recorder = BattleRecorder(args.record, parameters=dict(parameters, seed=args.seed))
+        callbacks.append(recorder.callback(engine))
+
+    def on_report(report):
+        for callback in callbacks:
+            callback(report)
+
+    try:
+        engine.run(args.frames - engine.frame, callback=on_report)
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if args.checkpoint:
+            engine.save_checkpoint(args.checkpoint)
+
+    final_report(engine)
+    print(f"Frames: {engine.frame}  U.S.: {len(engine.blue)}  PAVN: {len(engine.red)}")
+    if profiler is not None:
+        profiler.write_json(args.profile)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import numpy as np
+
+# Below this many query/target pairs a direct distance matrix beats walking grid rings
+BRUTE_FORCE_PAIRS = 1 << 20
+# Pairs per block when computing that distance matrix, to bound the scratch memory
+BRUTE_FORCE_BLOCK = 1 << 16
+# Queries answered per pass of nearest(), so candidate lists never grow with the query count
+QUERY_CHUNK = 1 << 16
+
+
+# ------------------ Uniform Grid (Cell List) ------------------
+class UniformGrid:
+    """
+    Buckets a set of 2D target points into square cells so that nearest-neighbour
+    queries only look at the cells around each query point instead of every target.
+    """
+
+    def __init__(self, points, cell_size=None, bounds=None, points_per_cell=1.0):
+        self.points = np.asarray(points)[:, :2]
+        n = len(self.points)
+
+        if bounds is None:
+            if n > 0:
+                lo, hi = self.points.min(axis=0), self.points.max(axis=0)
+            else:
+                lo, hi = np.zeros(2), np.ones(2)
+        else:
+            lo, hi = bounds
+        self.lo = np.asarray(lo, dtype=np.float64) * np.ones(2)
+        extent = np.maximum(np.asarray(hi, dtype=np.float64) - self.lo, 1e-9)
+
+        if cell_size is None:
+            # Size cells so that each one holds a handful of targets on average
+            cell_size = np.sqrt(extent[0] * extent[1] * points_per_cell / max(n, 1))
+        self.cell_size = float(max(cell_size, 1e-9))
+        self.shape = tuple(np.maximum(np.ceil(extent / self.cell_size).astype(int), 1))
+
+        nx, ny = self.shape
+        cells = self.cell_ids(self.points)
+        self.order = np.argsort(cells, kind="stable")
+        self.sorted_points = self.points[self.order]
+        self.count = np.bincount(cells, minlength=nx * ny)
+        self.start = np.cumsum(self.count) - self.count
+
+    def cell_coords(self, queries):
+        coords = np.floor((np.asarray(queries)[:, :2] - self.lo) / self.cell_size).astype(np.int64)
+        np.clip(coords[:, 0], 0, self.shape[0] - 1, out=coords[:, 0])
+        np.clip(coords[:, 1], 0, self.shape[1] - 1, out=coords[:, 1])
+        return coords
+
+    def cell_ids(self, queries):
+        coords = self.cell_coords(queries)
+        return coords[:, 0] * self.shape[1] + coords[:, 1]
+
+    def _gather(self, cx, cy):
+        """
+        Expands a (queries x cells) block of cell coordinates into candidate targets.
+        Returns the number of candidates per query and their indices into
+        self.sorted_points, grouped contiguously by query.
+        """
+        nx, ny = self.shape
+        valid = (cx >= 0) & (cx < nx) & (cy >= 0) & (cy < ny)
+        counts = np.where(valid, self.count[np.where(valid, cx * ny + cy, 0)], 0)
+        starts = self.start[np.where(valid, cx * ny + cy, 0)]
+
+        counts, starts = counts.ravel(), starts.ravel()
+        total = int(counts.sum())
+        first = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return counts.reshape(cx.shape).sum(axis=1), first + np.arange(total)
+
+    def nearest(self, queries):
+        """
+        Returns (index, distance) of the nearest target for every query point.
+        Index is -1 and distance is inf when the grid holds no targets.
+        Queries are answered QUERY_CHUNK at a time to bound the scratch memory.
+        """
+        queries = np.asarray(queries)[:, :2]
+        if len(queries) <= QUERY_CHUNK:
+            return self._nearest(queries)
+        index = np.empty(len(queries), dtype=np.int64)
+        distance = np.empty(len(queries))
+        for start in range(0, len(queries), QUERY_CHUNK):
+            index[start:start + QUERY_CHUNK], distance[start:start + QUERY_CHUNK] = \
+                self._nearest(queries[start:start + QUERY_CHUNK])
+        return index, distance
+
+    def _nearest(self, queries):
+        m = len(queries)
+        best_d2 = np.full(m, np.inf)
+        best_i = np.full(m, -1, dtype=np.int64)
+        if m == 0 or len(self.points) == 0:
+            return best_i, np.sqrt(best_d2)
+
+        coords = self.cell_coords(queries)
+        active = np.arange(m)
+        if m * len(self.points) <= BRUTE_FORCE_PAIRS:
+            self._brute_nearest(queries, active, best_i, best_d2)
+            return best_i, np.sqrt(best_d2)
+
+        # The centre cell alone can never prove a nearest target, so the first pass covers rings 0 and 1
+        for ring in range(1, max(self.shape) + 1):
+            dx, dy = _ring_offsets(ring) if ring > 1 else _block_offsets(1)
+            per_query, candidates = self._gather(coords[active, 0][:, None] + dx,
+                                                 coords[active, 1][:, None] + dy)
+            found = per_query > 0
+            if found.any():
+                owners = np.repeat(active, per_query)
+                diff = self.sorted_points[candidates] - queries[owners]
+                d2 = np.einsum("ij,ij->i", diff, diff)
+
+                # Candidates are contiguous per query, so each query's minimum is one reduceat
+                group_start = (np.cumsum(per_query) - per_query)[found]
+                ring_best = np.minimum.reduceat(d2, group_start)
+                hit = d2 == np.repeat(ring_best, per_query[found])
+                better = ring_best < best_d2[active[found]]
+                winners = hit & np.repeat(better, per_query[found])
+                best_i[owners[winners]] = self.order[candidates[winners]]
+                best_d2[active[found][better]] = ring_best[better]
+
+            # Every unsearched cell is at least `ring` cells away from the query's cell
+            reach = ring * self.cell_size
+            active = active[best_d2[active] > reach * reach]
+            if len(active) * len(self.points) <= BRUTE_FORCE_PAIRS:
+                self._brute_nearest(queries, active, best_i, best_d2)
+                break
+
+        return best_i, np.sqrt(best_d2)
+
+
+    def _brute_nearest(self, queries, active, best_i, best_d2):
+        """
+        Resolves the remaining queries against every target, a block of rows at a time.
+        Uses |t|^2 - 2 q.t so the distance matrix is a single matrix product per block.
+        """
+        targets = self.points.astype(np.float64)
+        target_norms = np.einsum("ij,ij->i", targets, targets)
+        rows = max(1, BRUTE_FORCE_BLOCK // len(targets))
+        for first in range(0, len(active), rows):
+            block = active[first:first + rows]
+            nearest = (target_norms - 2.0 * (queries[block] @ targets.T)).argmin(axis=1)
+            diff = targets[nearest] - queries[block]
+            best_i[block] = nearest
+            best_d2[block] = np.einsum("ij,ij->i", diff, diff)
+
+
+def _ring_offsets(ring, _cache={}):
+    """
+    Cell offsets (dx, dy) at Chebyshev distance `ring` from the centre cell.
+    """
+    if ring not in _cache:
+        r = np.arange(-ring, ring + 1)
+        dx, dy = np.meshgrid(r, r, indexing="ij")
+        on_ring = np.maximum(np.abs(dx), np.abs(dy)) == ring
+        _cache[ring] = (dx[on_ring], dy[on_ring])
+    return _cache[ring]
+
+
+def _block_offsets(radius):
+    """
+    Cell offsets (dx, dy) of the full square block within Chebyshev distance `radius`.
+    """
+    r = np.arange(-radius, radius + 1)
+    dx, dy = np.meshgrid(r, r, indexing="ij")
+    return dx.ravel(), dy.ravel()
@@ -0,0 +1,348 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from battle_engine import parse_parameters
+from monte_carlo import OUTCOMES, _run_chunk
+
+# The factors the project studies (see README)
+SWEEP_PARAMETERS = (
+    "num_units_blue", "num_units_red", "alpha", "beta",
+    "reinforcement_rate_blue", "reinforcement_rate_red",
+    "step_size", "fight_radius", "terrain_variation", "elevation_advantage",
+)
+INTEGER_PARAMETERS = ("num_units_blue", "num_units_red")
+# Bump when the engine's random streams or rules change, so stale cached points are not reused
+ENGINE_VERSION = 2
+METRICS = ("blue_win_probability", "red_win_probability", "mean_battle_length", "blue_share")
+
+
+# ------------------ Experimental Designs ------------------
+def _as_points(names, unit_samples, ranges):
+    """
+    Scales samples in [0, 1)^k onto the parameter ranges and returns a list of parameter dicts.
+    """
+    points = []
+    for row in np.atleast_2d(unit_samples):
+        point = {}
+        for name, u in zip(names, row):
+            low, high = ranges[name]
+            value = low + float(u) * (high - low)
+            point[name] = int(round(value)) if name in INTEGER_PARAMETERS else value
+        points.append(point)
+    return points
+
+
+def _check_ranges(ranges):
+    unknown = set(ranges) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Cannot sweep over: {', '.join(sorted(unknown))}")
+    return list(ranges)
+
+
+def grid_design(ranges, levels=5):
+    """
+    Full factorial grid with `levels` evenly spaced values per parameter.
+    """
+    names = _check_ranges(ranges)
+    axes = [np.linspace(0.0, 1.0, levels)] * len(names)
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return _as_points(names, np.column_stack([m.ravel() for m in mesh]), ranges)
+
+
+def latin_hypercube(ranges, n, seed=None):
+    """
+    Latin hypercube sample: every parameter's range is cut into n strata, each hit once.
+    """
+    names = _check_ranges(ranges)
+    rng = np.random.default_rng(seed)
+    strata = np.argsort(rng.random((n, len(names))), axis=0)
+    return _as_points(names, (strata + rng.random((n, len(names)))) / n, ranges)
+
+
+def sobol_sequence(n, dimensions, seed=None):
+    """
+    Scrambled Sobol points in [0, 1)^dimensions. Needs SciPy (scipy.stats.qmc).
+    """
+    try:
+        from scipy.stats import qmc
+    except ImportError as error:
+        raise ImportError("Sobol designs need SciPy: pip install scipy") from error
+    return qmc.Sobol(d=dimensions, scramble=True, seed=seed).random(n)
+
+
+def sobol_design(ranges, n, seed=None):
+    """
+    Space-filling design drawn from a scrambled Sobol sequence.
+    """
+    names = _check_ranges(ranges)
+    return _as_points(names, sobol_sequence(n, len(names), seed), ranges)
+
+
+def saltelli_design(ranges, n, seed=None, sampler="sobol"):
+    """
+    Saltelli cross-sampling design for Sobol indices: base matrices A and B plus,
+    for every parameter i, the matrix AB_i (A with column i taken from B).
+    Returns n * (k + 2) points ordered as A, B, AB_1, ..., AB_k.
+    """
+    names = _check_ranges(ranges)
+    k = len(names)
+    if sampler == "sobol":
+        base = sobol_sequence(n, 2 * k, seed)
+    else:
+        base = np.random.default_rng(seed).random((n, 2 * k))
+    a, b = base[:, :k], base[:, k:]
+    blocks = [a, b]
+    for i in range(k):
+        ab = a.copy()
+        ab[:, i] = b[:, i]
+        blocks.append(ab)
+    return _as_points(names, np.vstack(blocks), ranges)
+
+
+def morris_design(ranges, trajectories, levels=4, seed=None):
+    """
+    Morris one-at-a-time trajectories on a `levels`-point grid. Each trajectory has
+    k + 1 points and changes one parameter per step by delta = levels / (2 (levels - 1)).
+    """
+    names = _check_ranges(ranges)
+    k = len(names)
+    rng = np.random.default_rng(seed)
+    delta = levels / (2.0 * (levels - 1))
+    grid = np.arange(levels // 2) / (levels - 1)
+
+    samples = []
+    for _ in range(trajectories):
+        start = rng.choice(grid, size=k)
+        signs = rng.choice([-1.0, 1.0], size=k)
+        current = np.where(signs > 0, start, start + delta)
+        samples.append(current.copy())
+        for i in rng.permutation(k):
+            current[i] += signs[i] * delta
+            samples.append(current.copy())
+    return _as_points(names, np.array(samples), ranges)
+
+
+# ------------------ Cached, Parallel Evaluation ------------------
+def point_key(parameters, runs, n_frames, seed):
+    """
+    Stable hash of everything that determines a design point's result.
+    """
+    payload = json.dumps({"parameters": parameters, "runs": runs, "frames": n_frames, "seed": seed,
+                          "engine": ENGINE_VERSION}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def evaluate_point(parameters, runs, n_frames, seed, key):
+    """
+    Runs `runs` battles for one design point and reduces them to the sweep metrics.
+    The seed mixes the sweep seed with the point's hash, so a point gives the same
+    answer no matter which design (or which position in it) it appears in.
+    """
+    seeds = np.random.SeedSequence([seed if seed is not None else 0, int(key[:16], 16)]).spawn(runs)
+    winner, decisive, frames, blue, red = _run_chunk(parameters, seeds, n_frames)
+    total = (blue + red).astype(np.float64)
+    share = np.divide(blue, total, out=np.full(runs, 0.5), where=total > 0)
+    return {
+        "blue_win_probability": float(np.mean(winner == OUTCOMES.index("blue"))),
+        "red_win_probability": float(np.mean(winner == OUTCOMES.index("red"))),
+        "mean_battle_length": float(frames.mean()),
+        "blue_share": float(share.mean()),
+    }
+
+
+def evaluate_design(points, runs=20, n_frames=200, seed=None, workers=None, cache_dir="sweep_cache", fixed=None):
+    """
+    Evaluates every design point in parallel, reusing results cached on disk by
+    parameter hash. `fixed` holds parameters kept at one value for the whole
+    sweep (e.g. engagement="local"); they are merged into every point and its
+    cache key. Returns one metrics dict per point, in design order.
+    """
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    results = [None] * len(points)
+    pending = {}
+    for index, point in enumerate(points):
+        point = dict(fixed or {}, **point)
+        key = point_key(point, runs, n_frames, seed)
+        path = os.path.join(cache_dir, f"{key}.json") if cache_dir else None
+        if path and os.path.exists(path):
+            with open(path, "r") as file:
+                results[index] = json.load(file)["metrics"]
+        else:
+            # Duplicate points (common in grids of integer parameters) are only run once
+            pending.setdefault(key, (point, path, []))[2].append(index)
+
+    if pending:
+        work = list(pending.items())
+        args = ([point for _, (point, _, _) in work], [runs] * len(work), [n_frames] * len(work),
+                [seed] * len(work), [key for key, _ in work])
+        workers = workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            if pool is None:
+                metrics = map(evaluate_point, *args)
+            else:
+                metrics = pool.map(evaluate_point, *args, chunksize=max(1, len(work) // (workers * 4)))
+
+            # Cache each point as soon as it is done, so an interrupted sweep keeps its progress
+            for (key, (point, path, indices)), point_metrics in zip(work, metrics):
+                for index in indices:
+                    results[index] = point_metrics
+                if path:
+                    with open(path + ".tmp", "w") as file:
+                        json.dump({"parameters": point, "runs": runs, "frames": n_frames, "seed": seed,
+                                   "metrics": point_metrics}, file)
+                    os.replace(path + ".tmp", path)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+    return results
+
+
+# ------------------ Sensitivity Indices ------------------
+def sobol_indices(y, k):
+    """
+    First-order (Saltelli 2010) and total-order (Jansen) Sobol indices from model
+    outputs evaluated on a saltelli_design with k parameters.
+    """
+    y = np.asarray(y, dtype=np.float64).reshape(k + 2, -1)
+    y_a, y_b, y_ab = y[0], y[1], y[2:]
+    variance = np.var(np.concatenate((y_a, y_b)))
+    if variance == 0:
+        return np.zeros(k), np.zeros(k)
+    first = np.mean(y_b * (y_ab - y_a), axis=1) / variance
+    total = 0.5 * np.mean((y_a - y_ab) ** 2, axis=1) / variance
+    return first, total
+
+
+def morris_indices(points, y, names, ranges):
+    """
+    Morris elementary-effect statistics (mu, mu*, sigma) for each parameter, in
+    units of the output per full parameter range.
+    """
+    k = len(names)
+    x = np.array([[(p[name] - ranges[name][0]) / (ranges[name][1] - ranges[name][0]) for name in names] for p in points])
+    y = np.asarray(y, dtype=np.float64)
+    effects = [[] for _ in range(k)]
+    for start in range(0, len(points), k + 1):
+        for step in range(start, start + k):
+            change = x[step + 1] - x[step]
+            i = int(np.argmax(np.abs(change)))
+            if change[i] != 0:
+                effects[i].append((y[step + 1] - y[step]) / change[i])
+
+    mu, mu_star, sigma = (np.full(k, np.nan) for _ in range(3))
+    for i, values in enumerate(effects):
+        if values:
+            values = np.array(values)
+            mu[i], mu_star[i] = values.mean(), np.abs(values).mean()
+            sigma[i] = values.std(ddof=1) if len(values) > 1 else 0.0
+    return mu, mu_star, sigma
+
+
+# ------------------ Sweep Driver ------------------
+def run_sweep(ranges, method="sobol", samples=64, levels=5, runs=20, n_frames=200, seed=None,
+              workers=None, cache_dir="sweep_cache", fixed=None):
+    """
+    Generates a design, evaluates it and, for the "sobol" and "morris" methods,
+    computes sensitivity indices for every outcome metric.
+    method: "grid", "lhs", "sobol" (Saltelli design + Sobol indices) or "morris".
+    `fixed` sets parameters that are not swept, such as engagement="local" for a
+    sweep over fight_radius or elevation_advantage.
+    """
+    names = _check_ranges(ranges)
+    fixed = dict(fixed or {})
+    overlap = set(fixed) & set(ranges)
+    if overlap:
+        raise ValueError(f"Cannot both sweep and fix: {', '.join(sorted(overlap))}")
+    if method == "grid":
+        points = grid_design(ranges, levels)
+    elif method == "lhs":
+        points = latin_hypercube(ranges, samples, seed)
+    elif method == "sobol":
+        points = saltelli_design(ranges, samples, seed)
+    elif method == "morris":
+        points = morris_design(ranges, samples, levels, seed)
+    else:
+        raise ValueError(f"Unknown design method: {method}")
+
+    metrics = evaluate_design(points, runs, n_frames, seed, workers, cache_dir, fixed)
+    sweep = {"method": method, "parameters": names, "fixed": fixed, "points": points, "metrics": metrics,
+             "sensitivity": {}}
+
+    for metric in METRICS:
+        y = [m[metric] for m in metrics]
+        if method == "sobol":
+            first, total = sobol_indices(y, len(names))
+            sweep["sensitivity"][metric] = {name: {"first_order": float(s1), "total_order": float(st)}
+                                            for name, s1, st in zip(names, first, total)}
+        elif method == "morris":
+            mu, mu_star, sigma = morris_indices(points, y, names, ranges)
+            sweep["sensitivity"][metric] = {name: {"mu": float(a), "mu_star": float(b), "sigma": float(c)}
+                                            for name, a, b, c in zip(names, mu, mu_star, sigma)}
+    return sweep
+
+
+def print_sensitivity(sweep):
+    for metric, indices in sweep["sensitivity"].items():
+        print("\n--------------------------------------------------")
+        print(f"📊 **Sensitivity of {metric}** 📊")
+        key = "total_order" if sweep["method"] == "sobol" else "mu_star"
+        for name, stats in sorted(indices.items(), key=lambda item: -np.nan_to_num(item[1][key])):
+            print(f"{name:>24}: " + ", ".join(f"{label}={value:.3f}" for label, value in stats.items()))
+
+
+# ------------------ Command Line ------------------
+def parse_range(text):
+    """
+    Parses NAME=LOW:HIGH for one of the swept parameters.
+    """
+    name, sep, bounds = text.partition("=")
+    low, colon, high = bounds.partition(":")
+    if not sep or not colon or name not in SWEEP_PARAMETERS:
+        raise argparse.ArgumentTypeError(f"expected NAME=LOW:HIGH with NAME in: {', '.join(SWEEP_PARAMETERS)}")
+    return name, (float(low), float(high))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parameter sweeps and sensitivity analysis for the battle model.")
+    parser.add_argument("--range", dest="ranges", type=parse_range, action="append", required=True,
+                        metavar="NAME=LOW:HIGH", help="parameter range to sweep (repeatable)")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="NAME=VALUE",
+                        help="hold a parameter that is not swept at this value (repeatable)")
+    parser.add_argument("--method", choices=("grid", "lhs", "sobol", "morris"), default="sobol")
+    parser.add_argument("--samples", type=int, default=64,
+                        help="base samples (sobol), points (lhs) or trajectories (morris)")
+    parser.add_argument("--levels", type=int, default=5, help="levels per parameter (grid, morris)")
+    parser.add_argument("--runs", type=int, default=20, help="battles per design point")
+    parser.add_argument("--frames", type=int, default=200, help="frame limit per battle")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--cache-dir", default="sweep_cache", help="directory of cached design points")
+    parser.add_argument("--json", dest="json_path", default=None, help="write the full sweep to this JSON file")
+    args = parser.parse_args(argv)
+    try:
+        fixed = parse_parameters(args.overrides)
+    except ValueError as error:
+        parser.error(str(error))
+
+    start = time.perf_counter()
+    sweep = run_sweep(dict(args.ranges), args.method, args.samples, args.levels, args.runs, args.frames,
+                      args.seed, args.workers, args.cache_dir, fixed)
+    print(f"Evaluated {len(sweep['points'])} design points in {time.perf_counter() - start:.1f} s")
+    print_sensitivity(sweep)
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(sweep, file, indent=4)
+    return sweep
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import numpy as np
+
+
+# ------------------ Struct-of-Arrays Unit Storage ------------------
+class UnitStore:
+    """
+    Preallocated storage for one side's units. Positions, elevation and health live
+    in separate float32 arrays; casualties only clear a slot's alive flag and
+    reinforcements reuse free slots, so a frame never copies the whole army.
+    Capacity doubles when every slot is in use.
+    """
+
+    def __init__(self, capacity=64, dtype=np.float32):
+        capacity = max(int(capacity), 1)
+        self.dtype = np.dtype(dtype)
+        self.positions = np.zeros((capacity, 2), dtype=self.dtype)
+        self.elevation = np.zeros(capacity, dtype=self.dtype)
+        self.health = np.zeros(capacity, dtype=self.dtype)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.count = 0
+        self.high_water = 0  # Slots at or beyond this index have never been used
+        self._indices = None
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def capacity(self):
+        return len(self.alive)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ("positions", "elevation", "health", "alive"))
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name in ("positions", "elevation", "health", "alive"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def indices(self):
+        """
+        Slot indices of the living units (cached until the next add or kill).
+        """
+        if self._indices is None:
+            self._indices = np.flatnonzero(self.alive[:self.high_water])
+        return self._indices
+
+    def add(self, positions, elevation, health=1.0):
+        """
+        Places new units in free slots (dead slots first, then unused ones) and
+        returns the slots they were given.
+        """
+        n = len(positions)
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+
+        dead = self.high_water - self.count
+        if dead > 0:
+            slots = np.flatnonzero(~self.alive[:self.high_water])[:n]
+        else:
+            slots = np.empty(0, dtype=np.int64)
+        fresh = n - len(slots)
+        if fresh > 0:
+            if self.high_water + fresh > self.capacity:
+                self._grow(self.high_water + fresh)
+            slots = np.concatenate((slots, np.arange(self.high_water, self.high_water + fresh)))
+            self.high_water += fresh
+
+        self.positions[slots] = positions
+        self.elevation[slots] = elevation
+        self.health[slots] = health
+        self.alive[slots] = True
+        self.count += n
+        self._indices = None
+        return slots
+
+    def kill(self, slots):
+        """
+        Marks the given (living) slots as casualties.
+        """
+        self.alive[slots] = False
+        self.count -= len(slots)
+        self._indices = None
+
+    # ------------------ Checkpointing ------------------
+    def state(self, prefix):
+        """
+        The store as named arrays (trimmed to the used slots) for np.savez.
+        """
+        used = self.high_water
+        return {
+            f"{prefix}_positions": self.positions[:used],
+            f"{prefix}_elevation": self.elevation[:used],
+            f"{prefix}_health": self.health[:used],
+            f"{prefix}_alive": self.alive[:used],
+            f"{prefix}_capacity": np.array(self.capacity),
+        }
+
+    @classmethod
+    def from_state(cls, arrays, prefix):
+        alive = arrays[f"{prefix}_alive"]
+        store = cls(capacity=int(arrays[f"{prefix}_capacity"]), dtype=arrays[f"{prefix}_positions"].dtype)
+        used = len(alive)
+        store.positions[:used] = arrays[f"{prefix}_positions"]
+        store.elevation[:used] = arrays[f"{prefix}_elevation"]
+        store.health[:used] = arrays[f"{prefix}_health"]
+        store.alive[:used] = alive
+        store.high_water = used
+        store.count = int(np.count_nonzero(alive))
+        return store
+
+    # ------------------ Compact Views for Rendering / Export ------------------
+    def live_positions(self):
+        return self.positions[self.indices()]
+
+    def live_elevation(self):
+        return self.elevation[self.indices()]
+
+    def to_array(self):
+        """
+        Living units as an (n, 3) array of x, y, elevation.
+        """
+        idx = self.indices()
+        return np.column_stack((self.positions[idx], self.elevation[idx]))
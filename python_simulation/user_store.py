@@ -0,0 +1,275 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+# ------------------ Storage Backends ------------------
+class JsonUserStore:
+    """
+    Legacy backend: every save rewrites the whole JSON file. Kept for tools that
+    still expect military_users.json; writes go through a temporary file and a
+    rename so a crash never leaves a truncated file behind.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._batch_depth = 0
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            self._data = {}
+            if os.path.exists(self.path):
+                with open(self.path, "r") as file:
+                    try:
+                        self._data = json.load(file)
+                    except json.JSONDecodeError:
+                        self._data = {}  # Reset if file is corrupted
+        return self._data
+
+    def _flush(self):
+        with open(self.path + ".tmp", "w") as file:
+            json.dump(self._data, file, indent=4)
+        os.replace(self.path + ".tmp", self.path)
+
+    def get(self, name):
+        with self._lock:
+            return self._load().get(name)
+
+    def put(self, name, record):
+        with self._lock:
+            self._load()[name] = record
+            if self._batch_depth == 0:
+                self._flush()
+
+    def update(self, name, change):
+        """
+        Re-reads the file (outside a batch), applies change(record), which edits the
+        record in place, and writes it back.
+        """
+        with self._lock:
+            if self._batch_depth == 0:
+                self._data = None
+            record = self._load().get(name)
+            if record is None:
+                raise KeyError(name)
+            change(record)
+            if self._batch_depth == 0:
+                self._flush()
+            return record
+
+    def names(self):
+        with self._lock:
+            return list(self._load())
+
+    @contextmanager
+    def batch(self):
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._data is not None:
+                    self._flush()
+
+    def close(self):
+        pass
+
+
+class SQLiteUserStore:
+    """
+    Default backend: one row per player in an SQLite database in WAL mode, so a
+    save touches a single row and several simulator processes can read while one
+    writes. Writes take the lock up front (BEGIN IMMEDIATE) and wait out other
+    writers for up to `timeout` seconds. Inside batch() all puts share one commit.
+    """
+
+    def __init__(self, path, timeout=5.0):
+        self.path = path
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+        with self._transaction():
+            self._conn.execute("CREATE TABLE IF NOT EXISTS users (name TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            if self._batch_depth:
+                yield self._conn
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def get(self, name):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM users WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, name, record):
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO users (name, data) VALUES (?, ?) "
+                         "ON CONFLICT(name) DO UPDATE SET data = excluded.data", (name, json.dumps(record)))
+
+    def update(self, name, change):
+        """
+        Read-modify-write of one player inside a single BEGIN IMMEDIATE transaction,
+        so an edit made by another process in the meantime is never overwritten.
+        `change` edits the record in place.
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT data FROM users WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                raise KeyError(name)
+            record = json.loads(row[0])
+            change(record)
+            conn.execute("UPDATE users SET data = ? WHERE name = ?", (json.dumps(record), name))
+        return record
+
+    def names(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT name FROM users ORDER BY name")]
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups every put inside the block into a single transaction.
+        """
+        with self._transaction():
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+
+    def migrate_json(self, json_path):
+        """
+        One-time import of a legacy military_users.json. The import and the
+        "migrated" marker are written in the same transaction, so when several
+        processes start at once exactly one of them performs it. The JSON file is
+        renamed afterwards so it is not mistaken for live data.
+        Returns the number of players imported.
+        """
+        if not os.path.exists(json_path):
+            return 0
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_json'").fetchone():
+                return 0
+            legacy = JsonUserStore(json_path)
+            players = {name: legacy.get(name) for name in legacy.names()}
+            conn.executemany("INSERT OR IGNORE INTO users (name, data) VALUES (?, ?)",
+                             [(name, json.dumps(record)) for name, record in players.items()])
+            conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_json', ?)", (os.path.abspath(json_path),))
+        os.replace(json_path, json_path + ".migrated")
+        return len(players)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_user_store(path, backend="sqlite", legacy_json=None):
+    """
+    Opens the user store. With the SQLite backend an existing legacy JSON file is
+    migrated into the database the first time it is opened.
+    """
+    if backend == "json":
+        return JsonUserStore(path)
+    if backend != "sqlite":
+        raise ValueError(f"Unknown user store backend: {backend}")
+    store = SQLiteUserStore(path)
+    if legacy_json:
+        store.migrate_json(legacy_json)
+    return store
+
+
+# ------------------ In-Memory View of Player Records ------------------
+class UserCache:
+    """
+    Dict-like access to player records that loads each player on first use
+    instead of reading every commander at startup. Changes go through
+    update(name, change), which applies them to the stored record atomically
+    and refreshes the cached copy; save(name) writes the cached copy back as is
+    and is only safe when no other process edits that player.
+    """
+
+    def __init__(self, opener):
+        self._opener = opener
+        self._store = None
+        self._records = {}
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = self._opener()
+        return self._store
+
+    def __getitem__(self, name):
+        if name not in self._records:
+            record = self.store.get(name)
+            if record is None:
+                raise KeyError(name)
+            self._records[name] = record
+        return self._records[name]
+
+    def __setitem__(self, name, record):
+        self._records[name] = record
+        self.store.put(name, record)
+
+    def __contains__(self, name):
+        return name in self._records or self.store.get(name) is not None
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def update(self, name, change):
+        """
+        Applies change(record) to the stored record (see the stores' update) and
+        returns the cached record. Only the top-level dict is refreshed in place:
+        nested values (e.g. record["progress"]) are replaced, so callers must re-read
+        them from the record after an update or reload instead of keeping them.
+        """
+        return self._refresh(name, self.store.update(name, change))
+
+    def reload(self, name):
+        """
+        Re-reads a player's record, picking up changes made by other processes.
+        Like update(), this replaces the record's nested values.
+        """
+        record = self.store.get(name)
+        if record is None:
+            self._records.pop(name, None)
+            raise KeyError(name)
+        return self._refresh(name, record)
+
+    def _refresh(self, name, record):
+        cached = self._records.setdefault(name, record)
+        if cached is not record:
+            cached.clear()
+            cached.update(record)
+        return cached
+
+    def save(self, name):
+        self.store.put(name, self._records[name])
+
+    def save_all(self):
+        with self.store.batch():
+            for name in self._records:
+                self.store.put(name, self._records[name])